@@ -15,6 +15,7 @@ from typing import List, Dict, Any
 from src.crawler import MangaDexMangaCrawler, MangaDexChapterCrawler, MangaDexImageCrawler
 from src.utils import setup_logger
 from src.populate_db import pg_config, mongo_config
+from src.populate_db.init_db_scripts import DashboardSchema
 from src.populate_db.update_db import (
     update_manga_data_postgres,
     update_chapter_data_postgres,
@@ -460,6 +461,23 @@ def update_manga_database_dag():
             transaction.rollback()
             raise AirflowException(f"Database update failed: {str(e)}")
 
+    @task
+    def refresh_dashboard_aggregates():
+        try:
+            logger.info("Refreshing dashboard aggregate tables")
+            dashboard_schema = DashboardSchema(pg_config)
+            dashboard_schema.create_columns()
+            dashboard_schema.create_indexes()
+            dashboard_schema.create_tables()
+            dashboard_schema.create_triggers()
+            dashboard_schema.analyze_tables()
+            dashboard_schema.refresh_genre_cooccurrence()
+            dashboard_schema.refresh_summary_metrics()
+            logger.info("Dashboard aggregate tables refreshed")
+        except Exception as e:
+            logger.error(f"Failed to refresh dashboard aggregates: {str(e)}")
+            raise AirflowException(f"Dashboard aggregate refresh failed: {str(e)}")
+
     @task
     def extract_manga_ids(new_mangas: list[dict]) -> list[str]:
         return [manga['manga_id'] for manga in new_mangas]
@@ -542,9 +560,10 @@ def update_manga_database_dag():
     new_images = fetch_and_process_image_data(chapter_ids)
 
     update_task = update_all_databases(connections, new_mangas, new_chapters, new_images)
+    refresh_task = refresh_dashboard_aggregates()
     email_task = send_success_email()
 
-    update_task >> email_task
+    update_task >> [refresh_task, email_task]
 
 
 dag = update_manga_database_dag()
@@ -6,13 +6,29 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
 from src.dashboard.core.components.sidebar import render_sidebar
-from src.dashboard.core.components.dashboard import render_dashboard
+from src.dashboard.core.components.dashboard import render_dashboard, invalidate_stale_caches
 from src.dashboard.core.utils.data_cleaning import initialize_session_state
 import logging
 
 # Configure logging
 logging.basicConfig(filename='app.log', level=logging.INFO, format='%(asctime)s - %(message)s')
 
+# Fetched through <link> tags rather than a CSS @import, so the font download starts
+# in parallel with rendering instead of after the style block is parsed
+FONT_LINKS = (
+    '<link rel="preconnect" href="https://fonts.googleapis.com">'
+    '<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>'
+    '<link rel="stylesheet" href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap">'
+)
+
+
+@st.cache_resource
+def load_styles(path):
+    """Read the stylesheet once per process and return it as a ready-to-emit style block."""
+    with open(path) as f:
+        return f"{FONT_LINKS}<style>{f.read()}</style>"
+
+
 # Initialize session state
 initialize_session_state()
 
@@ -24,11 +40,11 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Apply custom CSS
-with open("src/dashboard/core/config/styles.css") as f:
-    st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+# Apply custom CSS; it must be re-emitted on every rerun or Streamlit drops it from the page
+st.markdown(load_styles("src/dashboard/core/config/styles.css"), unsafe_allow_html=True)
 
-# Render sidebar and dashboard
+# Drop cached query results if the pipeline has loaded new data, then render sidebar and dashboard
+invalidate_stale_caches()
 render_sidebar()
 render_dashboard()
 
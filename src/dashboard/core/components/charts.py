@@ -58,7 +58,8 @@ def create_year_vs_mangas_histogram(df):
     if df.empty or 'published_year' not in df.columns:
         return None
 
-    grouped = df.groupby('published_year').size().reset_index(name='manga_count')
+    # Rows arrive pre-aggregated per year; summing keeps the chart correct for finer-grained input too
+    grouped = df.groupby('published_year', as_index=False)['manga_count'].sum()
     grouped = grouped.sort_values('published_year')
 
     y_smooth = savgol_filter(grouped['manga_count'], window_length=5, polyorder=2)
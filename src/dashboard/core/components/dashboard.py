@@ -1,13 +1,20 @@
 import streamlit as st
 import pandas as pd
-from sqlalchemy import text
 import re
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 from src.dashboard.core.database.postgres import (
-    get_postgres_engine
+    connect_postgres,
+    get_postgres_engine,
+    read_sql_arrow,
+    sql_text,
+    load_filter_options
 )
 from src.dashboard.core.utils.export import format_number
 from src.dashboard.core.utils.insights import generate_insights
-from src.dashboard.core.utils.search import sanitize_input
+from src.dashboard.core.utils.filters import FrozenFilters, freeze_filters, build_manga_where
 from src.dashboard.core.components.charts import (
     create_status_pie,
     create_year_vs_mangas_histogram,
@@ -20,177 +27,199 @@ from src.dashboard.core.utils.display_image import load_and_display_cover, displ
 
 
 SAMPLE_ROWS = 100
+# SELECT expression for each manga column load_manga_page can return
+MANGA_COLUMNS = {
+    'manga_id': "manga_id::text as manga_id",
+    'title': "title",
+    'status': "status",
+    'published_year': "published_year",
+    'genres': "genres_clean as genres",
+    'original_language': "original_language",
+    'updated_at': "updated_at",
+}
+# Columns the sample table and the sample-based overview charts read
+SAMPLE_COLUMNS = ('title', 'status', 'published_year', 'genres', 'original_language')
+# Data loaders have no TTL; they are cleared when the pipeline loads new data
+DATA_CACHE_ENTRIES = 256
+# Background threads that run loader queries while the page renders its other sections
+PREFETCH_WORKERS = 8
+_prefetch_pool = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="dashboard-prefetch")
+_INSIGHT_RE = re.compile(r"^(.*?):")
+_INSIGHT_REPL = r'<span style="color:orange; font-weight:bold;">\1:</span>'
+
+QUICK_STATS_QUERY = """
+SELECT 
+    COUNT(DISTINCT m.manga_id) as total_manga,
+    COUNT(c.chapter_id) as total_chapters,
+    COALESCE(SUM(c.pages), 0) as total_images,
+    COALESCE(AVG(c.pages), 0) as avg_pages_per_chapter
+FROM manga m
+LEFT JOIN chapter c ON m.manga_id = c.manga_id
+{where_clause}
+"""
+
+SUMMARY_METRICS_QUERY = """
+SELECT
+    MAX(metric_value) FILTER (WHERE metric_name = 'total_manga') as total_manga,
+    MAX(metric_value) FILTER (WHERE metric_name = 'total_chapters') as total_chapters,
+    MAX(metric_value) FILTER (WHERE metric_name = 'total_images') as total_images,
+    MAX(metric_value) FILTER (WHERE metric_name = 'avg_pages_per_chapter') as avg_pages_per_chapter
+FROM summary_metrics
+"""
+
+# summary_metrics.last_updated moves on every manga or chapter insert and delete (via triggers) and
+# on every pipeline run's refresh; manga.updated_at covers in-place edits of existing manga
+DATA_VERSION_QUERY = """
+SELECT
+    (SELECT MAX(last_updated) FROM summary_metrics) as metrics_updated,
+    (SELECT MAX(updated_at) FROM manga) as manga_updated
+"""
+
+
+@st.cache_data(max_entries=DATA_CACHE_ENTRIES, hash_funcs={FrozenFilters: hash})
+def load_quick_stats(selected_manga=None, manga_filters=None):
+    """Load quick stats, either global or for a specific manga; failures raise to the caller."""
+    engine = connect_postgres()
+    params = {}
+    if selected_manga:
+        # Stats for specific manga
+        query = """
+        SELECT 
+            1 as total_manga,
+            COUNT(c.chapter_id) as total_chapters,
+            COALESCE(SUM(c.pages), 0) as total_images,
+            COALESCE(AVG(c.pages), 0) as avg_pages_per_chapter
+        FROM manga m
+        LEFT JOIN chapter c ON m.manga_id = c.manga_id
+        WHERE m.title = :title
+        GROUP BY m.manga_id
+        """
+        params['title'] = selected_manga
+        with engine.connect() as conn:
+            df = pd.read_sql_query(sql_text(query), conn, params=params, dtype_backend="pyarrow")
 
+        # Ensure all metrics are present
+        if df.empty:
+            df = pd.DataFrame([{
+                'total_manga': 0,
+                'total_chapters': 0,
+                'total_images': 0,
+                'avg_pages_per_chapter': 0
+            }])
+    elif not manga_filters:
+        # Global stats from summary_metrics, refreshed by the pipeline after each load
+        with engine.connect() as conn:
+            df = pd.read_sql_query(sql_text(SUMMARY_METRICS_QUERY), conn, dtype_backend="pyarrow")
+            if df.isna().any(axis=None):
+                # summary_metrics has not been populated yet, so compute the stats live
+                df = pd.read_sql_query(sql_text(QUICK_STATS_QUERY.format(where_clause="")), conn,
+                                       dtype_backend="pyarrow")
+    else:
+        # Filtered stats
+        manga_where, params = build_manga_where(manga_filters)
+        with engine.connect() as conn:
+            df = pd.read_sql_query(sql_text(QUICK_STATS_QUERY.format(where_clause=manga_where)), conn,
+                                   params=params, dtype_backend="pyarrow")
 
-@st.cache_data(ttl=3600)
-def load_quick_stats(selected_manga=None, manga_filters=None):
-    """Load quick stats, either global or for a specific manga."""
-    engine = get_postgres_engine()
-    if not engine:
-        return pd.DataFrame()
-    try:
-        params = {}
-        if selected_manga:
-            # Stats for specific manga
-            query = """
-            SELECT 
-                1 as total_manga,
-                COUNT(c.chapter_id) as total_chapters,
-                COALESCE(SUM(c.pages), 0) as total_images,
-                COALESCE(AVG(c.pages), 0) as avg_pages_per_chapter
-            FROM manga m
-            LEFT JOIN chapter c ON m.manga_id = c.manga_id
-            WHERE m.title = :title
-            GROUP BY m.manga_id
-            """
-            params['title'] = selected_manga
-            with engine.connect() as conn:
-                results = conn.execute(text(query), params)
-                df = pd.DataFrame(results.fetchall(), columns=results.keys())
-
-            # Ensure all metrics are present
-            if df.empty:
-                df = pd.DataFrame([{
-                    'total_manga': 0,
-                    'total_chapters': 0,
-                    'total_images': 0,
-                    'avg_pages_per_chapter': 0
-                }])
-        else:
-            # Filtered stats
-            conditions = []
-            if manga_filters:
-                for k, v in manga_filters.items():
-                    if k == 'published_year' and v.get('year_range'):
-                        if v['include_null']:
-                            conditions.append(
-                                "(m.published_year BETWEEN :year_min AND :year_max OR m.published_year IS NULL)")
-                        else:
-                            conditions.append("m.published_year BETWEEN :year_min AND :year_max")
-                        params['year_min'] = v['year_range'][0]
-                        params['year_max'] = v['year_range'][1]
-                    elif k == 'genres' and v:
-                        placeholders = ','.join([f':g{i}' for i in range(len(v))])
-                        conditions.append(f"EXISTS (SELECT 1 FROM unnest(m.genres) g WHERE g IN ({placeholders}))")
-                        for i, val in enumerate(v):
-                            params[f'g{i}'] = val
-                    elif k == 'status' and v:
-                        placeholders = ','.join([f':s{i}' for i in range(len(v))])
-                        conditions.append(f"m.status IN ({placeholders})")
-                        for i, val in enumerate(v):
-                            params[f's{i}'] = val
-                    elif k == 'original_language' and v:
-                        placeholders = ','.join([f':ol{i}' for i in range(len(v))])
-                        conditions.append(f"m.original_language IN ({placeholders})")
-                        for i, val in enumerate(v):
-                            params[f'ol{i}'] = val
-
-            manga_where = " WHERE " + " AND ".join(conditions) if conditions else ""
-            query = f"""
-            SELECT 
-                COUNT(DISTINCT m.manga_id) as total_manga,
-                COUNT(c.chapter_id) as total_chapters,
-                COALESCE(SUM(c.pages), 0) as total_images,
-                COALESCE(AVG(c.pages), 0) as avg_pages_per_chapter
-            FROM manga m
-            LEFT JOIN chapter c ON m.manga_id = c.manga_id
-            {manga_where}
-            """
+        if df.empty:
+            df = pd.DataFrame([{
+                'total_manga': 0,
+                'total_chapters': 0,
+                'total_images': 0,
+                'avg_pages_per_chapter': 0
+            }])
+    return df
+
+
+# Narrow dtypes for chart frames; only order-free, low-cardinality labels become categories
+CHART_DTYPES = {
+    'status': 'category',
+    'original_language': 'category',
+    'count': 'Int32',
+    'manga_count': 'Int32',
+    'chapter_count': 'Int32',
+    'published_year': 'Int16',
+}
+
+
+def quantize_dtypes(df):
+    """Cast known chart columns to their narrow dtypes."""
+    return df.astype({col: dtype for col, dtype in CHART_DTYPES.items() if col in df.columns})
+
+
+# Column layout of each chart's rows in the unified chart query
+_CHART_COLUMNS = {
+    "status": {'label': 'status', 'value': 'count'},
+    "genres": {'label': 'genre', 'value': 'count'},
+    "language": {'label': 'original_language', 'value': 'count'},
+    "chapter_counts": {'label': 'title', 'value': 'chapter_count'},
+    "year_vs_mangas": {'year': 'published_year', 'value': 'manga_count'},
+}
+
+
+@st.cache_data(max_entries=DATA_CACHE_ENTRIES, hash_funcs={FrozenFilters: hash})
+def load_all_chart_data(filters=None):
+    """Load every filter-driven chart in one query, scanning the filtered manga only once.
+
+    Failures raise to the caller, which reports them on the script thread.
+    """
+    where_clause, params = build_manga_where(filters)
+    query = f"""
+    WITH fm AS MATERIALIZED (
+        SELECT m.manga_id, m.title, m.status, m.published_year, m.genres_clean, m.original_language
+        FROM manga m
+        {where_clause}
+    )
+    SELECT 'status' as kind, status as label, NULL::int as year, COUNT(*) as value
+    FROM fm
+    GROUP BY status
+    UNION ALL
+    (SELECT 'genres', g, NULL, COUNT(*)
+     FROM fm, unnest(fm.genres_clean) g
+     GROUP BY g
+     ORDER BY COUNT(*) DESC
+     LIMIT 5)
+    UNION ALL
+    SELECT 'language', original_language, NULL, COUNT(*)
+    FROM fm
+    GROUP BY original_language
+    UNION ALL
+    (SELECT 'chapter_counts', fm.title, NULL, COUNT(c.chapter_id)
+     FROM fm
+     LEFT JOIN chapter c ON fm.manga_id = c.manga_id
+     GROUP BY fm.title
+     ORDER BY COUNT(c.chapter_id) DESC
+     LIMIT 5)
+    UNION ALL
+    SELECT 'year_vs_mangas', NULL, published_year, COUNT(DISTINCT title)
+    FROM fm
+    GROUP BY published_year
+    """
+    df = read_sql_arrow(query, params)
 
-            # Global stats from summary_metrics
-            with engine.connect() as conn:
-                results = conn.execute(text(query), params)
-                df = pd.DataFrame(results.fetchall())
-
-            if df.empty:
-                df = pd.DataFrame([{
-                    'total_manga': 0,
-                    'total_chapters': 0,
-                    'total_images': 0,
-                    'avg_pages_per_chapter': 0
-                }])
-        return df
-    except Exception as e:
-        st.error(f"Error loading quick stats: {str(e)}")
-        return pd.DataFrame()
+    charts = {}
+    for kind, columns in _CHART_COLUMNS.items():
+        chart_df = df.loc[df['kind'] == kind, list(columns)].rename(columns=columns)
+        charts[kind] = chart_df.reset_index(drop=True)
+    if charts['status'].empty:
+        charts['status'] = pd.DataFrame({'status': ['No Data'], 'count': [0]})
+    if charts['genres'].empty:
+        charts['genres'] = pd.DataFrame({'genre': ['No Data'], 'count': [0]})
+    return {kind: quantize_dtypes(chart_df) for kind, chart_df in charts.items()}
 
 
-@st.cache_data(ttl=3600, hash_funcs={dict: lambda x: str(sorted(x.items()))})
+@st.cache_data(max_entries=DATA_CACHE_ENTRIES, hash_funcs={FrozenFilters: hash})
 def load_chart_data(filters=None, query_type="aggregate"):
     """Load data for charts with filters applied, fetching all rows."""
     engine = get_postgres_engine()
     if not engine:
         return pd.DataFrame()
     try:
-        params = {}
-        conditions = []
-        if filters:
-            for k, v in filters.items():
-                if k == 'published_year' and v.get('year_range'):
-                    if v['include_null']:
-                        conditions.append(
-                            "(m.published_year BETWEEN :year_min AND :year_max OR m.published_year IS NULL)")
-                    else:
-                        conditions.append("m.published_year BETWEEN :year_min AND :year_max")
-                    params['year_min'] = v['year_range'][0]
-                    params['year_max'] = v['year_range'][1]
-                elif k == 'status' and v:
-                    placeholders = ', '.join([f':s{i}' for i in range(len(v))])
-                    conditions.append(f"m.status IN ({placeholders})")
-                    for i, val in enumerate(v):
-                        params[f's{i}'] = val
-                elif k == 'original_language' and v:
-                    placeholders = ', '.join([f':o{i}' for i in range(len(v))])
-                    conditions.append(f"m.original_language IN ({placeholders})")
-                    for i, val in enumerate(v):
-                        params[f'o{i}'] = val
-                elif k == 'title' and v:
-                    conditions.append("m.title = :title")
-                    params['title'] = v
-                elif k == 'genres' and isinstance(v, list) and v:
-                    placeholders = ', '.join([f':g{i}' for i in range(len(v))])
-                    conditions.append(f"m.genres && ARRAY[{placeholders}]")
-                    for i, val in enumerate(v):
-                        params[f'g{i}'] = val
-                elif isinstance(v, str) and '%' in v:
-                    conditions.append(f"m.{k} ILIKE :{k}")
-                    params[k] = v
-                elif isinstance(v, list) and v:
-                    placeholders = ', '.join([f':{k}{i}' for i in range(len(v))])
-                    conditions.append(f"m.{k} IN ({placeholders})")
-                    for i, val in enumerate(v):
-                        params[f'{k}{i}'] = val
-                elif v:
-                    conditions.append(f"m.{k} = :{k}")
-                    params[k] = v
-
-        where_clause = " WHERE " + " AND ".join(conditions) if conditions else ""
-
-        if query_type == "status":
-            query = f"""
-            SELECT m.status, COUNT(*) as count
-            FROM manga AS m
-            {where_clause}
-            GROUP BY status
-            """
+        where_clause, params = build_manga_where(filters)
 
-            with engine.connect() as conn:
-                results = conn.execute(text(query), params)
-                df = pd.DataFrame(results.fetchall(), columns=['status', 'count'])
-            return df if not df.empty else pd.DataFrame({'status': ['No Data'], 'count': [0]})
-        elif query_type == "genres":
-            query = f"""
-            SELECT trim(g) as genre, COUNT(*) as count
-            FROM manga m, unnest(genres) g
-            {where_clause}
-            GROUP BY genre
-            ORDER BY count DESC
-            LIMIT 5
-            """
-            with engine.connect() as conn:
-                results = conn.execute(text(query), params)
-                df = pd.DataFrame(results.fetchall())
-            return df if not df.empty else pd.DataFrame({'genre': ['No Data'], 'count': [0]})
+        if query_type in _CHART_COLUMNS:
+            # Filter-driven charts share one cached query instead of a round-trip each
+            return load_all_chart_data(filters).get(query_type, pd.DataFrame())
         elif query_type == "chapter_trend":
             query = f"""
             SELECT DATE_TRUNC('month', c.created_at)::date as month_year, COUNT(*) as count
@@ -201,69 +230,42 @@ def load_chart_data(filters=None, query_type="aggregate"):
             ORDER BY month_year
             """
 
-            with engine.connect() as conn:
-                results = conn.execute(text(query), params)
-                df = pd.DataFrame(results.fetchall())
-            return df
-        elif query_type == "year_vs_mangas":
-            query = f"""
-            SELECT m.published_year, COUNT(m.manga_id) as manga_count, m.title
-            FROM manga m
-            {where_clause}
-            GROUP BY m.published_year, m.title
-            """
-
-            with engine.connect() as conn:
-                results = conn.execute(text(query), params)
-                df = pd.DataFrame(results.fetchall())
-            return df
-        elif query_type == "language":
-            query = f"""
-            SELECT m.original_language, COUNT(*) as count
-            FROM manga AS m
-            {where_clause}
-            GROUP BY m.original_language
-            """
-
-            with engine.connect() as conn:
-                results = conn.execute(text(query), params)
-                df = pd.DataFrame(results.fetchall())
-            return df
+            return read_sql_arrow(query, params)
         elif query_type == "genre_cooccurrence":
+            if filters and filters.title:
+                # A single manga has no other manga to co-occur with
+                return pd.DataFrame(columns=['genre1', 'genre2', 'count'])
+            if not (filters and filters.genres):
+                # Status, language and year filters can be served from the nightly pre-aggregated pairs
+                cooccurrence_where, cooccurrence_params = build_manga_where(filters, alias="c")
+                query = f"""
+                SELECT c.genre1, c.genre2, SUM(c.count) as count
+                FROM manga_genre_cooccurrence c
+                {cooccurrence_where}
+                GROUP BY c.genre1, c.genre2
+                ORDER BY count DESC
+                LIMIT 100
+                """
+                return read_sql_arrow(query, cooccurrence_params)
+            # Pair each filtered manga's own sorted genre array by subscript instead of
+            # self-joining the whole unnested table on manga_id
             query = f"""
-            WITH genres AS (
-                SELECT m.manga_id, trim(g) as genre
-                FROM manga m, unnest(m.genres) g
+            WITH filtered AS (
+                SELECT ARRAY(SELECT DISTINCT g FROM unnest(m.genres_clean) g ORDER BY 1) as genres
+                FROM manga m
+                {where_clause}
             )
-            SELECT g1.genre as genre1, g2.genre as genre2, COUNT(*) as count
-            FROM genres g1
-            JOIN genres g2 ON g1.manga_id = g2.manga_id AND g1.genre < g2.genre
-            JOIN manga m ON g1.manga_id = m.manga_id
-            {where_clause}
-            GROUP BY g1.genre, g2.genre
+            SELECT f.genres[i] as genre1, f.genres[j] as genre2, COUNT(*) as count
+            FROM filtered f,
+                LATERAL generate_subscripts(f.genres, 1) i,
+                LATERAL generate_subscripts(f.genres, 1) j
+            WHERE i < j
+            GROUP BY 1, 2
             ORDER BY count DESC
             LIMIT 100
             """
 
-            with engine.connect() as conn:
-                results = conn.execute(text(query), params)
-                df = pd.DataFrame(results.fetchall())
-            return df
-        elif query_type == "chapter_counts":
-            query = f"""
-            SELECT m.title, COUNT(c.chapter_id) as chapter_count
-            FROM manga m
-            LEFT JOIN chapter c ON m.manga_id = c.manga_id
-            {where_clause}
-            GROUP BY m.title
-            ORDER BY chapter_count DESC
-            LIMIT 5
-            """
-
-            with engine.connect() as conn:
-                results = conn.execute(text(query), params)
-                df = pd.DataFrame(results.fetchall())
-            return df
+            return read_sql_arrow(query, params)
         else:
             raise ValueError(f"Invalid query_type: {query_type}")
     except Exception as e:
@@ -271,94 +273,188 @@ def load_chart_data(filters=None, query_type="aggregate"):
         return pd.DataFrame()
 
 
-@st.cache_data(ttl=3600, hash_funcs={dict: lambda x: str(sorted(x.items()))})
-def load_manga_df(manga_filters=None, selected_manga=None):
-    """Load manga DataFrame with filters applied, limited to 100 rows."""
+@st.cache_data(max_entries=DATA_CACHE_ENTRIES, hash_funcs={FrozenFilters: hash})
+def load_manga_page(manga_filters=None, selected_manga=None, columns=SAMPLE_COLUMNS,
+                    limit=SAMPLE_ROWS, offset=0):
+    """Load one page of filtered manga, newest first, selecting only the requested columns."""
     engine = get_postgres_engine()
     if not engine:
         return pd.DataFrame()
     try:
-        params = {}
-        manga_conditions = []
+        select_list = ", ".join(MANGA_COLUMNS[col] for col in columns)
         if selected_manga:
-            query = f"""
-            SELECT manga_id, title, status, published_year, genres, original_language, updated_at, cover_url
-            FROM manga
-            WHERE title = :title
-            """
-            params['title'] = selected_manga
-            with engine.connect() as conn:
-                results = conn.execute(text(query), params)
-                df = pd.DataFrame(results.fetchall(), columns=results.keys())
-            if df.empty:
-                df = pd.DataFrame(columns=['manga_id', 'title', 'status', 'published_year',
-                                           'genres', 'original_language', 'updated_at', 'cover_url'])
-            df['manga_id'] = df['manga_id'].astype(str)
-            return df
-
-        if manga_filters:
-
-            for k, v in manga_filters.items():
-                if k == 'published_year':
-                    if v['include_null'] and v['year_range']:
-                        manga_conditions.append(f"(published_year BETWEEN :year_min AND :year_max OR published_year IS NULL)")
-                        params['year_min'] = v['year_range'][0]
-                        params['year_max'] = v['year_range'][1]
-                    elif v['include_null']:
-                        manga_conditions.append("published_year IS NULL")
-                    elif v['year_range']:
-                        manga_conditions.append(f"published_year BETWEEN :year_min AND :year_max")
-                        params['year_min'] = v['year_range'][0]
-                        params['year_max'] = v['year_range'][1]
-                elif k == 'genres' and v:
-                    placeholders = ','.join([f':g{i}' for i in range(len(v))])
-                    manga_conditions.append(f"EXISTS (SELECT 1 FROM unnest(genres) g WHERE g IN ({placeholders}))")
-                    for i, val in enumerate(v):
-                        params[f'g{i}'] = val
-                elif k == 'status' and v:
-                    placeholders = ','.join([f':s{i}' for i in range(len(v))])
-                    manga_conditions.append(f"status IN ({placeholders})")
-                    for i, val in enumerate(v):
-                        params[f's{i}'] = val
-                elif k == 'original_language' and v:
-                    placeholders = ','.join([f':ol{i}' for i in range(len(v))])
-                    manga_conditions.append(f"original_language IN ({placeholders})")
-                    for i, val in enumerate(v):
-                        params[f'ol{i}'] = val
-                elif k == 'title' and v:
-                    manga_conditions.append("title = :title")
-                    params['title'] = v
-
-        manga_where = " WHERE " + " AND ".join(manga_conditions) if manga_conditions else ""
+            manga_where, params = " WHERE title = :title", {'title': selected_manga}
+        else:
+            manga_where, params = build_manga_where(manga_filters, alias=None)
         query = f"""
-        SELECT manga_id, title, status, published_year, genres, original_language, updated_at, cover_url
+        SELECT {select_list}
         FROM manga
         {manga_where}
-        LIMIT 100
+        ORDER BY updated_at DESC
+        LIMIT :limit OFFSET :offset
         """
-        with engine.connect() as conn:
-            results = conn.execute(text(query), params)
-            df = pd.DataFrame(results.fetchall(), columns=results.keys())
+        params.update(limit=limit, offset=offset)
+        df = read_sql_arrow(query, params)
         if df.empty:
-            df = pd.DataFrame(columns=['manga_id', 'title', 'status', 'published_year',
-                                       'genres', 'original_language', 'updated_at', 'cover_url'])
-        df['manga_id'] = df['manga_id'].astype(str)
+            df = pd.DataFrame(columns=list(columns))
         return df
     except Exception as e:
         st.error(f"Error loading manga DataFrame: {str(e)}")
         return pd.DataFrame()
 
 
+@st.cache_data(ttl=600, hash_funcs={FrozenFilters: hash})
+def load_random_covers(manga_filters=None, n=9):
+    """Load a small random set of filtered manga that have a cover image, sampled in SQL; failures raise."""
+    manga_where, params = build_manga_where(manga_filters, alias=None)
+    cover_condition = "cover_url IS NOT NULL AND cover_url <> ''"
+    manga_where = f"{manga_where} AND {cover_condition}" if manga_where else f" WHERE {cover_condition}"
+    # Only the narrow manga_id rows are shuffled; the wide display columns are then read for
+    # the n sampled rows alone, kept in their sampled order
+    query = f"""
+    SELECT m.title, m.cover_url, m.status, m.genres_clean as genres, m.published_year
+    FROM (
+        SELECT manga_id, random() AS draw
+        FROM manga
+        {manga_where}
+        ORDER BY draw
+        LIMIT :n
+    ) AS sampled
+    JOIN manga m USING (manga_id)
+    ORDER BY sampled.draw
+    """
+    params['n'] = n
+    return read_sql_arrow(query, params)
+
+
+@st.cache_data(max_entries=DATA_CACHE_ENTRIES, hash_funcs={FrozenFilters: hash}, show_spinner=False)
+def load_insights(filters, selected_manga=None, _manga_filters=None):
+    """Generate insights once per canonical filter key; the raw filter dict is not hashed."""
+    return generate_insights(_manga_filters, selected_manga)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def load_data_version():
+    """Return a version marker that changes whenever the pipeline loads new data."""
+    engine = get_postgres_engine()
+    if not engine:
+        return None
+    try:
+        with engine.connect() as conn:
+            return tuple(conn.execute(sql_text(DATA_VERSION_QUERY)).one())
+    except Exception as e:
+        logging.error(f"Error loading data version: {str(e)}")
+        return None
+
+
+@st.cache_resource
+def _seen_data_version():
+    """Process-wide record of the data version the cached loaders were filled from."""
+    return {'version': None}
+
+
+def invalidate_stale_caches():
+    """Clear the data loaders once new data lands, instead of expiring them all on a TTL."""
+    version = load_data_version()
+    # Exposed to the session so per-session copies, like the filter options, know when to reload
+    st.session_state['data_version'] = version
+    seen = _seen_data_version()
+    if version is None or version == seen['version']:
+        return
+    if seen['version'] is not None:
+        clear_data_caches()
+    seen['version'] = version
+
+
+def clear_data_caches():
+    """Clear the cached query results, keeping the cover image caches."""
+    for loader in (load_quick_stats, load_all_chart_data, load_chart_data, load_manga_page,
+                   load_random_covers, load_insights, load_filter_options):
+        loader.clear()
+
+
+def prefetch(loader, *args):
+    """Start a cached loader on a worker thread so its query overlaps the script thread's work.
+
+    Loaders get everything they need as arguments, make no st calls and raise on failure;
+    collect the result with collect_prefetched, which reports errors on the script thread.
+    """
+    ctx = get_script_run_ctx()
+
+    def load():
+        # Cached calls expect a script run context, which pool threads do not have
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return loader(*args)
+
+    return _prefetch_pool.submit(load)
+
+
+def collect_prefetched(future, what, default):
+    """Wait for a prefetched loader, reporting its failure here on the script thread."""
+    try:
+        return future.result()
+    except Exception as e:
+        st.error(f"Error loading {what}: {str(e)}")
+        return default
+
+
+def summarize_sample(manga_df, query_type):
+    """Derive status, genre or language chart data directly from the sample DataFrame."""
+    if query_type == "status":
+        summary = manga_df['status'].value_counts(dropna=False).reset_index()
+    elif query_type == "genres":
+        genres = manga_df['genres'].explode().dropna()
+        summary = genres.value_counts().head(5).rename_axis('genre').reset_index()
+    elif query_type == "language":
+        summary = manga_df['original_language'].value_counts(dropna=False).reset_index()
+    else:
+        raise ValueError(f"Invalid query_type: {query_type}")
+    return quantize_dtypes(summary)
+
+
+def load_overview_data(manga_df, filters, query_type):
+    """Load overview chart data, skipping SQL when the sample already holds every filtered manga."""
+    # A full sample means LIMIT probably truncated the population, so aggregate in SQL
+    if manga_df.shape[0] < SAMPLE_ROWS:
+        return summarize_sample(manga_df, query_type)
+    return load_chart_data(filters, query_type=query_type)
+
+
+@st.fragment
+def _overview_chart(manga_df, filters, query_type, create_figure):
+    """Render one overview chart as a fragment so it reruns independently of the page."""
+    fig = create_figure(load_overview_data(manga_df, filters, query_type))
+    if fig:
+        st.plotly_chart(fig, use_container_width=True)
+
+
+@st.fragment
+def _analysis_chart(filters, query_type, create_figure):
+    """Render one analysis chart as a fragment so it reruns independently of the page."""
+    fig = create_figure(load_chart_data(filters, query_type=query_type))
+    if fig:
+        st.plotly_chart(fig, use_container_width=True)
+
+
+@st.fragment
+def _cooccurrence_chart(filters):
+    """Render the genre co-occurrence heatmap, the heaviest query, only when requested."""
+    if not st.toggle("Show genre co-occurrence heatmap", key="show_genre_cooccurrence"):
+        return
+    with st.spinner("Loading genre co-occurrence..."):
+        fig = create_genre_cooccurrence_heatmap(load_chart_data(filters, query_type="genre_cooccurrence"))
+    if fig:
+        st.plotly_chart(fig, use_container_width=True)
+
+
+def format_insight(text):
+    """Highlight the label before the first colon of an insight."""
+    return _INSIGHT_RE.sub(_INSIGHT_REPL, text)
+
+
 def render_dashboard():
     """Render the main dashboard."""
 
-    def format_insight(text):
-        return re.sub(
-            r"^(.*?):",
-            r'<span style="color:orange; font-weight:bold;">\1:</span>',
-            text
-        )
-
     # Apply Filters
     manga_filters = {}
     if st.session_state.status_filter:
@@ -370,11 +466,28 @@ def render_dashboard():
     if st.session_state.published_year:
         manga_filters['published_year'] = st.session_state.published_year
     if 'selected_manga' in st.session_state and st.session_state.selected_manga:
-        manga_filters['title'] = sanitize_input(st.session_state.selected_manga)
+        manga_filters['title'] = st.session_state.selected_manga
+    # The default full year range with null years selects everything, so it freezes to no filter
+    frozen_filters = freeze_filters(manga_filters, year_bounds=load_filter_options()[1])
+
+    # Quick stats share the sample's filters but not its result, so run both queries at once
+    stats_future = prefetch(load_quick_stats, st.session_state.selected_manga, frozen_filters)
+    # Covers run their own query and do not depend on the sample, so start them now and collect
+    # them when their section renders
+    covers_future = None
+    if st.session_state.selected_manga is None:
+        covers_future = prefetch(load_random_covers, frozen_filters)
 
     # Load Sample Data for Tables
     with st.spinner("Loading sample manga data..."):
-        manga_df = load_manga_df(manga_filters, st.session_state.selected_manga)
+        manga_df = load_manga_page(frozen_filters, st.session_state.selected_manga)
+    has_enough = not manga_df.empty and manga_df.shape[0] > 10
+
+    # Every tab chart except the co-occurrence heatmap comes from one query; start it now so its
+    # latency overlaps the quick stats, covers and insights instead of adding to them
+    chart_future = None
+    if has_enough and not st.session_state.selected_manga:
+        chart_future = prefetch(load_all_chart_data, frozen_filters)
 
     # Dashboard Header
     col_title, col_updated = st.columns([3, 1])
@@ -384,7 +497,7 @@ def render_dashboard():
         st.markdown(f"**Last Refreshed:** {st.session_state.last_refresh} (UTC+7)")
 
     # Quick Stats
-    stats_df = load_quick_stats(st.session_state.selected_manga, manga_filters)
+    stats_df = collect_prefetched(stats_future, "quick stats", pd.DataFrame())
 
     if not stats_df.empty:
         total_manga = int(stats_df['total_manga'].iloc[0])
@@ -413,20 +526,24 @@ def render_dashboard():
     # Display random cover images
     if st.session_state.selected_manga is None:
         st.markdown("### 🔥 Random Manga Covers")
-        display_random_cover_images(manga_df)
+        display_random_cover_images(collect_prefetched(covers_future, "random covers", pd.DataFrame()))
 
     # Insights
     st.markdown("### 📈 Key Insights")
     with st.expander(" 💡Data Highlights", expanded=True):
-        flag, insights = generate_insights(manga_filters, st.session_state.selected_manga)
+        # Insights wait seconds on the LLM and web search, so they stay on this session's script
+        # thread rather than occupying a worker shared by every session
+        flag, insights = load_insights(frozen_filters, st.session_state.selected_manga, manga_filters)
 
         if not flag:
             st.warning("No insights available due to data retrieval issues.")
         else:
+            insight_blocks = []
             for insight_dict in insights:
                 insight = f"{insight_dict.get('icon')} {insight_dict.get('tooltip')}: {insight_dict.get('text')}"
-                style = format_insight(insight)
-                st.markdown(f'<div class="insight-box">{style}</div>', unsafe_allow_html=True)
+                insight_blocks.append(f'<div class="insight-box">{format_insight(insight)}</div>')
+            # One markdown call renders every insight in a single frontend update
+            st.markdown("\n".join(insight_blocks), unsafe_allow_html=True)
 
     # # Export Options
     # if st.session_state.selected_manga is None:
@@ -435,92 +552,80 @@ def render_dashboard():
     #     if manga_df is not None and not manga_df.empty:
     #         combined_df = manga_df.merge(chapter_df, on='manga_id', how='left', suffixes=('_manga', '_chapter'))
     #         if export_format in ["CSV", "Excel", "Parquet"]:
-    #             st.markdown(export_data(combined_df, "manga_chapter_data", export_format.lower()), unsafe_allow_html=True)
+    #             export_data(combined_df, "manga_chapter_data", export_format.lower())
 
     # Tabs
     tab1, tab2 = st.tabs(["📊 Overview", "📖 Manga Analysis"])
-    charts = {}
 
+    # Lay out both tabs with empty chart containers and render the sample table first,
+    # so the page paints before any chart query runs
     with tab1:
         st.header("Overview")
-        col1, col2 = st.columns(2)
-        if not manga_df.empty and manga_df.shape[0] > 10:
+        overview_area = st.container()
+
+    with tab2:
+        st.header("Manga Analysis")
+        analysis_area = st.container()
+
+        if not manga_df.empty:
+            num_rows = manga_df.shape[0]
+            st.markdown(f"""
+            <span style="color:#FF7F00; font-size:18px; font-weight:bold; padding:3px;">
+                Showing {num_rows} sample mangas
+            </span>
+            """, unsafe_allow_html=True)
+            # Column selection already returns a new frame, so no defensive copy is needed
+            display_cols = ['title', 'status', 'published_year', 'genres', 'original_language']
+            st.write(manga_df[display_cols])
+        else:
+            st.info("No manga data available.")
+
+    # Wait for the prefetch so the chart fragments below read its cached result; if it failed,
+    # nothing was cached and the fragments retry and report the error themselves
+    if chart_future is not None:
+        wait([chart_future])
+
+    with overview_area:
+        if has_enough:
+            col1, col2 = st.columns(2)
             with col1:
                 if not st.session_state.selected_manga:
-                    status_data = load_chart_data(query_type="status", filters=manga_filters)
-                    fig_status = create_status_pie(status_data)
-                    if fig_status:
-                        st.plotly_chart(fig_status, use_container_width=True)
-                        charts['status_distribution'] = fig_status
+                    _overview_chart(manga_df, frozen_filters, "status", create_status_pie)
                 else:
                     st.info("No manga data available for status distribution.")
             with col2:
                 if not st.session_state.selected_manga:
-                    genre_data = load_chart_data(query_type="genres", filters=manga_filters)
-                    fig_genre = create_genre_bar(genre_data)
-                    if fig_genre:
-                        st.plotly_chart(fig_genre, use_container_width=True)
-                        charts['genre_distribution'] = fig_genre
+                    _overview_chart(manga_df, frozen_filters, "genres", create_genre_bar)
                 else:
                     st.info("No genre data available.")
 
             if not st.session_state.selected_manga:
-                language_data = load_chart_data(query_type="language", filters=manga_filters)
-                fig_language = create_language_treemap(language_data)
-                if fig_language:
-                    st.plotly_chart(fig_language, use_container_width=True)
-                    charts['language_distribution'] = fig_language
+                _overview_chart(manga_df, frozen_filters, "language", create_language_treemap)
             else:
                 st.info("No language data available.")
         else:
             st.warning("Not enough manga data available.")
 
-    with tab2:
-        st.header("Manga Analysis")
-        col1, col2 = st.columns(2)
-        if not manga_df.empty and manga_df.shape[0] > 10:
+    with analysis_area:
+        if has_enough:
+            col1, col2 = st.columns(2)
             with col1:
                 if not st.session_state.selected_manga:
-                    bar_data = load_chart_data(manga_filters, query_type="chapter_counts")
-                    fig_bar = create_chapter_counts_bar(bar_data)
-                    if fig_bar:
-                        st.plotly_chart(fig_bar, use_container_width=True)
-                        charts['bar_distribution'] = fig_bar
+                    _analysis_chart(frozen_filters, "chapter_counts", create_chapter_counts_bar)
                 else:
                     st.info("No data for top manga by chapter count")
             with col2:
                 if not st.session_state.published_year.get('include_null'):
                     if not st.session_state.selected_manga:
-                        scatter_data = load_chart_data(manga_filters, query_type="year_vs_mangas")
-                        fig_scatter = create_year_vs_mangas_histogram(scatter_data)
-                        if fig_scatter:
-                            st.plotly_chart(fig_scatter, use_container_width=True)
-                            charts['year_vs_chapters'] = fig_scatter
+                        _analysis_chart(frozen_filters, "year_vs_mangas", create_year_vs_mangas_histogram)
                     else:
                         st.info("No data for year vs. mangas histogram plot.")
                 else:
                     st.warning("Disable 'Include Null Published Year' to plot the published year vs. manga count histogram.")
 
             if not st.session_state.selected_manga:
-                cooccurrence_data = load_chart_data(manga_filters, query_type="genre_cooccurrence")
-                fig_cooccurrence = create_genre_cooccurrence_heatmap(cooccurrence_data)
-                if fig_cooccurrence:
-                    st.plotly_chart(fig_cooccurrence, use_container_width=True)
-                    charts['genre_cooccurrence'] = fig_cooccurrence
+                _cooccurrence_chart(frozen_filters)
             else:
                 st.info("No genre co-occurrence data available.")
         else:
             st.warning("Not enough manga data available.")
-
-        if not manga_df.empty:
-            num_rows = manga_df.shape[0]
-            st.markdown(f"""
-            <span style="color:#FF7F00; font-size:18px; font-weight:bold; padding:3px;">
-                Showing {num_rows} sample mangas
-            </span>
-            """, unsafe_allow_html=True)
-            display_manga = manga_df.copy()
-            display_cols = ['title', 'status', 'published_year', 'genres', 'original_language']
-            st.write(display_manga[display_cols])
-        else:
-            st.info("No manga data available.")
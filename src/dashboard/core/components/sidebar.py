@@ -1,12 +1,13 @@
 import streamlit as st
 from streamlit_searchbox import st_searchbox
-from src.dashboard.core.database.postgres import load_filter_options, get_postgres_engine
+from src.dashboard.core.database.postgres import load_filter_options, get_postgres_engine, sql_text
 from src.dashboard.core.utils.search import search_manga
+from src.dashboard.core.components.dashboard import clear_data_caches, load_data_version
 from src.dashboard.core.config.config import load_config
 from datetime import datetime
-import pandas as pd
-from sqlalchemy import text
-from sqlalchemy.orm import sessionmaker
+
+
+INSERT_FEEDBACK = "INSERT INTO user_feedback (feedback_text) VALUES (:feedback_text)"
 
 
 def render_sidebar():
@@ -17,9 +18,15 @@ def render_sidebar():
     st.session_state.setdefault('original_language_filter', [])
     st.session_state.setdefault('selected_manga', None)
     st.session_state.setdefault('manga_filters_changed', False)
+    # Kept in the session until the data version moves, so reruns skip the cache_data hash and lookup
+    data_version = st.session_state.get('data_version')
+    filter_options = st.session_state.get('filter_options')
+    if filter_options is None or filter_options[0] != data_version:
+        filter_options = (data_version, load_filter_options())
+        st.session_state['filter_options'] = filter_options
+    status_options, year_range, genre_options, language_options = filter_options[1]
 
     if 'initialized' not in st.session_state:
-        status_options, year_range, genre_options, language_options = load_filter_options()
         st.session_state.published_year = {
             'include_null': True,
             'year_range': year_range
@@ -39,40 +46,11 @@ def render_sidebar():
         col1, col2 = st.columns(2)
         with col1:
             if st.button("🔄 Refresh Data", use_container_width=True):
-                engine = get_postgres_engine()
-                if engine:
-                    try:
-                        Session = sessionmaker(bind=engine)
-                        with Session() as session:
-                            session.execute(text("""
-                                UPDATE summary_metrics 
-                                SET metric_value = (SELECT COUNT(*) FROM manga), 
-                                    last_updated = NOW() 
-                                WHERE metric_name = 'total_manga';
-                            """))
-                            session.execute(text("""
-                                UPDATE summary_metrics 
-                                SET metric_value = (SELECT COUNT(*) FROM chapter), 
-                                    last_updated = NOW() 
-                                WHERE metric_name = 'total_chapters';
-                            """))
-                            session.execute(text("""
-                                UPDATE summary_metrics 
-                                SET metric_value = (SELECT SUM(pages) FROM chapter), 
-                                    last_updated = NOW() 
-                                WHERE metric_name = 'total_images';
-                            """))
-                            session.execute(text("""
-                                UPDATE summary_metrics 
-                                SET metric_value = (SELECT AVG(pages) FROM chapter), 
-                                    last_updated = NOW() 
-                                WHERE metric_name = 'avg_pages_per_chapter';
-                            """))
-                            session.commit()
-                        st.success("Metrics updated successfully!")
-                    except Exception as e:
-                        st.error(f"Error updating metrics: {str(e)}")
-                st.cache_data.clear()
+                # summary_metrics is kept current by database triggers, so refreshing only drops
+                # the cached query results instead of recounting manga and chapter
+                clear_data_caches()
+                load_data_version.clear()
+                st.session_state.pop('filter_options', None)
                 st.session_state.last_refresh = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                 st.rerun()
         with col2:
@@ -93,84 +71,90 @@ def render_sidebar():
             )
             st.session_state.selected_manga = selected_manga
 
-            with st.form("filters_form"):
-                status_options, year_range, genre_options, language_options = load_filter_options()
-
-                # # Initialize published_year if not set or if it's a tuple (legacy)
-                # if 'published_year' not in st.session_state or isinstance(st.session_state.published_year, tuple):
-                #     default_range = st.session_state.get('published_year', year_range)
-                #     if isinstance(default_range, tuple):
-                #         default_range = list(default_range)
-                #     st.session_state.published_year = {
-                #         'include_null': True,
-                #         'year_range': default_range
-                #     }
+            # Filters are ignored while a manga is selected, so skip building the form's widgets
+            if st.session_state.selected_manga:
+                st.caption(f"Filtering by **{st.session_state.selected_manga}**. "
+                           "Clear the search to change the other filters.")
+            else:
+                with st.form("filters_form"):
+                    # # Initialize published_year if not set or if it's a tuple (legacy)
+                    # if 'published_year' not in st.session_state or isinstance(st.session_state.published_year, tuple):
+                    #     default_range = st.session_state.get('published_year', year_range)
+                    #     if isinstance(default_range, tuple):
+                    #         default_range = list(default_range)
+                    #     st.session_state.published_year = {
+                    #         'include_null': True,
+                    #         'year_range': default_range
+                    #     }
 
-                include_null_year = st.checkbox(
-                    "Include Manga with No Published Year",
-                    value=st.session_state.published_year.get('include_null', True),
-                    key="include_null_year",
-                    help="Check to include manga with no published year."
-                )
-                selected_year_range = st.slider(
-                    "Published Year",
-                    year_range[0],
-                    year_range[1],
-                    st.session_state.published_year.get('year_range', year_range),
-                    key="year_range_slider",
-                    help="Select a year range to filter manga."
-                )
+                    include_null_year = st.checkbox(
+                        "Include Manga with No Published Year",
+                        value=st.session_state.published_year.get('include_null', True),
+                        key="include_null_year",
+                        help="Check to include manga with no published year."
+                    )
+                    selected_year_range = st.slider(
+                        "Published Year",
+                        year_range[0],
+                        year_range[1],
+                        st.session_state.published_year.get('year_range', year_range),
+                        key="year_range_slider",
+                        help="Select a year range to filter manga."
+                    )
 
-                selected_status = st.multiselect(
-                    "Manga Status",
-                    status_options,
-                    default=None if st.session_state.status_filter == [] else st.session_state.status_filter,
-                    key="status_multiselect",
-                    help="Select manga statuses to filter."
-                )
-                selected_genres = st.multiselect(
-                    "Genres",
-                    genre_options,
-                    default=None if st.session_state.genres_filter == [] else st.session_state.genres_filter,
-                    key="genres_multiselect",
-                    help="Select genres to filter manga."
-                )
-                selected_orig_lang = st.multiselect(
-                    "Original Language",
-                    language_options,
-                    default=None if st.session_state.original_language_filter == [] else st.session_state.original_language_filter,
-                    key="orig_lang_multiselect",
-                    help="Select original languages to filter manga."
-                )
+                    selected_status = st.multiselect(
+                        "Manga Status",
+                        status_options,
+                        default=None if st.session_state.status_filter == [] else st.session_state.status_filter,
+                        key="status_multiselect",
+                        help="Select manga statuses to filter."
+                    )
+                    selected_genres = st.multiselect(
+                        "Genres",
+                        genre_options,
+                        default=None if st.session_state.genres_filter == [] else st.session_state.genres_filter,
+                        key="genres_multiselect",
+                        help="Select genres to filter manga."
+                    )
+                    selected_orig_lang = st.multiselect(
+                        "Original Language",
+                        language_options,
+                        default=None if st.session_state.original_language_filter == [] else st.session_state.original_language_filter,
+                        key="orig_lang_multiselect",
+                        help="Select original languages to filter manga."
+                    )
 
-                col1, col2 = st.columns(2)
-                with col1:
-                    if st.form_submit_button("Apply Filters"):
-                        st.session_state.status_filter = selected_status
-                        st.session_state.genres_filter = selected_genres
-                        st.session_state.original_language_filter = selected_orig_lang
-                        st.session_state.published_year = {
-                            'include_null': include_null_year,
-                            'year_range': list(selected_year_range)
-                        }
-                        st.session_state.manga_filters_changed = True
-                        st.cache_data.clear()
-                        st.success("Filters applied!")
-                        st.rerun()
-                with col2:
-                    if st.form_submit_button("Reset Filters"):
-                        st.session_state.status_filter = []
-                        st.session_state.genres_filter = []
-                        st.session_state.original_language_filter = []
-                        st.session_state.published_year = {
-                            'include_null': True,
-                            'year_range': year_range
-                        }
-                        st.session_state.selected_manga = None
-                        st.session_state.pop("manga_search", None)
-                        st.cache_data.clear()
-                        st.success("Filters reset to original state!")
-                        st.rerun()
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        if st.form_submit_button("Apply Filters"):
+                            st.session_state.update({
+                                'status_filter': selected_status,
+                                'genres_filter': selected_genres,
+                                'original_language_filter': selected_orig_lang,
+                                'published_year': {
+                                    'include_null': include_null_year,
+                                    'year_range': list(selected_year_range)
+                                },
+                                'manga_filters_changed': True
+                            })
+                            # Loader caches are keyed on the filters, so nothing needs clearing
+                            st.success("Filters applied!")
+                            st.rerun()
+                    with col2:
+                        if st.form_submit_button("Reset Filters"):
+                            st.session_state.update({
+                                'status_filter': [],
+                                'genres_filter': [],
+                                'original_language_filter': [],
+                                'published_year': {
+                                    'include_null': True,
+                                    'year_range': year_range
+                                },
+                                'selected_manga': None
+                            })
+                            st.session_state.pop("manga_search", None)
+                            st.success("Filters reset to original state!")
+                            st.rerun()
 
         # Feedback
         with st.expander("💬 Feedback", expanded=True):
@@ -181,8 +165,9 @@ def render_sidebar():
                         engine = get_postgres_engine()
                         if engine:
                             try:
-                                pd.DataFrame([{'feedback_text': feedback}]).to_sql('user_feedback', engine,
-                                                                                   if_exists='append', index=False)
+                                # One parameterized INSERT, without building a DataFrame or reflecting the table
+                                with engine.begin() as conn:
+                                    conn.execute(sql_text(INSERT_FEEDBACK), {'feedback_text': feedback})
                                 st.success("Thank you for your feedback!")
                             except Exception as e:
                                 st.error(f"Error saving feedback: {str(e)}")
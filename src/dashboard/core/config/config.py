@@ -1,11 +1,14 @@
 from sqlalchemy import create_engine
 from dotenv import load_dotenv
+from functools import lru_cache, cached_property
 import os
 
 # Load .env file
 load_dotenv()
 
 
+# The environment is read once per process; callers share the returned dict and must not mutate it
+@lru_cache(maxsize=1)
 def load_config():
     pg_user = os.getenv("POSTGRES_USER")
     pg_password = os.getenv("POSTGRES_PASSWORD")
@@ -18,7 +21,10 @@ def load_config():
     return {
         "postgres": {
             "uri": f"postgresql://{pg_user}:{pg_password}@{pg_host}:5432/{pg_database}",
-            "ttl": 3600
+            "ttl": 3600,
+            "pool_size": 10,
+            "max_overflow": 20,
+            "pool_recycle": 1800
         },
         "mongodb": {
             "uri": os.getenv("MONGO_URI"),
@@ -30,15 +36,26 @@ def load_config():
             "cache_ttl": 1800,
             "page_sizes": [10, 25, 50, 100],
             "default_page_size": 50,
-            "max_search_results": 25
+            "max_search_results": 25,
+            # Let browsers load covers straight from the CDN instead of inlining base64 data URIs
+            "direct_cover_urls": os.getenv("DIRECT_COVER_URLS", "false").lower() == "true"
         }
     }
 
 
 class PostgresConfig:
-    def __init__(self):
-        config = load_config()
-        self.engine = create_engine(config["postgres"]["uri"])
+    @cached_property
+    def engine(self):
+        # Built on first use, so importing the config does not create a pool; one pooled engine
+        # per process, and pre-ping drops connections Postgres closed while idle
+        pg = load_config()["postgres"]
+        return create_engine(
+            pg["uri"],
+            pool_size=pg["pool_size"],
+            max_overflow=pg["max_overflow"],
+            pool_recycle=pg["pool_recycle"],
+            pool_pre_ping=True
+        )
 
 
 class MongoConfig:
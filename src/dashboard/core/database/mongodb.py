@@ -13,9 +13,8 @@ def get_mongo_collection():
         db = client[mongo_config.database_name]
         collection = db[mongo_config.collection_name]
         summary_collection = db['summary_metrics']
-        collection.create_index([("manga_id", 1)])
-        collection.create_index([("chapter_id", 1)])
-        collection.find_one()  # Test connection
+        # Indexes are ensured by the image loader at ingest time, and the driver connects lazily
+        # within serverSelectionTimeoutMS on first use, so no round trip is spent here
         return collection, summary_collection, client
     except Exception as e:
         st.error(f"Failed to connect to MongoDB: {str(e)}")
@@ -1,58 +1,83 @@
 import streamlit as st
+import pandas as pd
 from sqlalchemy.sql import text
 import logging
+from functools import lru_cache
 from src.dashboard.core.config.config import pg_config
 
 
-@st.cache_resource(ttl=3600)
+@st.cache_resource
+def connect_postgres():
+    """Build the shared PostgreSQL engine once per process and test it, raising on failure.
+
+    Code running off the script thread uses this and leaves reporting to the script thread.
+    """
+    engine = pg_config.engine
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    return engine
+
+
 def get_postgres_engine():
     """Get PostgreSQL engine with connection test."""
     try:
-        engine = pg_config.engine
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
-        return engine
+        # Failures raise out of the cached builder, so they are retried instead of cached
+        return connect_postgres()
     except Exception as e:
         st.error(f"Failed to connect to PostgreSQL: {str(e)}")
         logging.error(f"PostgreSQL connection error: {str(e)}")
         return None
 
 
-@st.cache_data(ttl=3600)
+@lru_cache(maxsize=256)
+def sql_text(query):
+    """Build the TextClause for a query string once and reuse it on later calls."""
+    # The engine's compiled cache is keyed on the statement, so reused clauses also skip recompilation
+    return text(query)
+
+
+def read_sql_arrow(query, params=None):
+    """Run a query on a pooled connection and return a PyArrow-backed DataFrame; failures raise."""
+    engine = connect_postgres()
+    with engine.connect() as conn:
+        return pd.read_sql_query(sql_text(query), conn, params=params, dtype_backend="pyarrow")
+
+
+# One scan of manga feeds every option set: joining each row to its unnested genres repeats it,
+# but DISTINCT aggregates and MIN/MAX are unaffected by the repeats
+FILTER_OPTIONS_QUERY = """
+SELECT
+    COALESCE(array_agg(DISTINCT m.status ORDER BY m.status), '{}') AS statuses,
+    COALESCE(MIN(m.published_year), 1900) AS year_min,
+    COALESCE(MAX(m.published_year), 2025) AS year_max,
+    COALESCE(array_agg(DISTINCT g ORDER BY g) FILTER (WHERE g IS NOT NULL), '{}') AS genres,
+    COALESCE(array_agg(DISTINCT m.original_language ORDER BY m.original_language), '{}') AS languages
+FROM manga m
+LEFT JOIN LATERAL unnest(m.genres_clean) AS g ON true
+"""
+
+
+@st.cache_data
 def load_filter_options():
     """Load filter options for status, year range, genres, and original language."""
     engine = get_postgres_engine()
     if not engine:
-        return [], [1900, 2025], [], []
+        return (), [1900, 2025], (), ()
 
     try:
+        # All four option sets come back as one row; psycopg2 returns the arrays as Python lists
         with engine.connect() as conn:
-            # Status options
-            result = conn.execute(text("SELECT DISTINCT status FROM manga ORDER BY status"))
-            status_options = [row[0] for row in result]
-
-            # Year range
-            result = conn.execute(text("SELECT MIN(published_year), MAX(published_year) FROM manga WHERE published_year IS NOT NULL"))
-            year_range = result.fetchone()
-            year_min = int(year_range.min) if year_range.min is not None else 1900
-            year_max = int(year_range.max) if year_range.max is not None else 2025
-
-            # Genre options from JSON array
-            genre_query = """
-                SELECT DISTINCT TRIM(g) AS genre
-                FROM manga, unnest(genres) AS g
-                ORDER BY genre
-            """
-            result = conn.execute(text(genre_query))
-            genre_options = [row[0] for row in result]
-
-            # Original languages
-            result = conn.execute(text("SELECT DISTINCT original_language FROM manga ORDER BY original_language"))
-            language_options = [row[0] for row in result]
-
-        return status_options, [year_min, year_max], genre_options, language_options
+            options = conn.execute(sql_text(FILTER_OPTIONS_QUERY)).mappings().one()
+
+        # Empty-table fallbacks are applied in SQL, so every value arrives non-null
+        return (
+            tuple(options['statuses']),
+            [int(options['year_min']), int(options['year_max'])],
+            tuple(options['genres']),
+            tuple(options['languages'])
+        )
 
     except Exception as e:
         st.error(f"Error loading filter options: {str(e)}")
         logging.error(f"Error loading filter options: {str(e)}")
-        return [], [1900, 2025], [], []
+        return (), [1900, 2025], (), ()
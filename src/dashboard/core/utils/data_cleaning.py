@@ -1,5 +1,6 @@
 # src/utils/data_cleaning.py
 import streamlit as st
+import pandas as pd
 from datetime import datetime
 
 
@@ -15,13 +16,19 @@ def robust_decode(val):
 def clean_dataframe(df, columns):
     """Apply robust_decode to specified columns and optimize data types."""
     for col in columns:
-        if col in df.columns:
-            df[col] = df[col].apply(robust_decode)
+        if col in df.columns and df[col].dtype == object:
+            # One C-level scan decides the path, so valid text columns are not touched cell by cell
+            kind = pd.api.types.infer_dtype(df[col], skipna=True)
+            if kind == 'bytes':
+                df[col] = df[col].str.decode('utf-8', errors='replace')
+            elif kind != 'string':
+                df[col] = df[col].map(robust_decode)
     for col in df.columns:
         if col.endswith('_id'):
             df[col] = df[col].astype('int32', errors='ignore')
-        elif df[col].dtype == 'float64':
-            df[col] = df[col].astype('float32', errors='ignore')
+    float_cols = [col for col in df.select_dtypes('float64').columns if not col.endswith('_id')]
+    if float_cols:
+        df[float_cols] = df[float_cols].astype('float32')
     return df
 
 
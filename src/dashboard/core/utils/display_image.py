@@ -1,41 +1,252 @@
 import streamlit as st
 import requests
-import base64
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+import threading
+from functools import lru_cache
+try:
+    # SIMD base64 codec; the stdlib module has the same b64encode API and serves as the fallback
+    import pybase64 as base64
+except ImportError:
+    import base64
+from io import BytesIO
+from PIL import Image
 import pandas as pd
-from sqlalchemy import text
-from src.dashboard.core.database.postgres import get_postgres_engine
-
-
-def fetch_cover_image(url):
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/114.0.0.0 Safari/537.36"
-        ),
-        "Referer": "https://uploads.mangadex.org/",
-        "Accept": "image/avif,image/webp,image/apng,image/*,*/*;q=0.8",
-        "Accept-Language": "en-US,en;q=0.9",
-        "Accept-Encoding": "gzip, deflate, br",
-        "Connection": "keep-alive",
-        "Cache-Control": "no-cache",
-        "Pragma": "no-cache",
-    }
-    try:
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            return response.content
+import pyarrow as pa
+import pyarrow.compute as pc
+from src.dashboard.core.database.postgres import get_postgres_engine, sql_text
+from src.dashboard.core.config.config import load_config
+
+
+# Shared HTTP session so cover downloads reuse pooled keep-alive connections
+_HTTP = requests.Session()
+_HTTP.headers.update({
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/114.0.0.0 Safari/537.36"
+    ),
+    "Referer": "https://uploads.mangadex.org/",
+    "Accept": "image/avif,image/webp,image/apng,image/*,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+    # Only advertise encodings requests can transparently decode (br needs brotli installed);
+    # keep decoding in mind if downloads ever switch to stream=True and read the raw body
+    "Accept-Encoding": requests.utils.DEFAULT_ACCEPT_ENCODING,
+    "Connection": "keep-alive",
+    # No no-cache headers: cover URLs are immutable, so CDN edge copies are always valid
+})
+# Covers come from a handful of CDN hosts, each kept in its own pool of up to 16 sockets
+_HTTP.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.3)
+))
+COVER_FETCH_WORKERS = 8
+# Shared by every session, so fetch threads are started once rather than per carousel render
+_COVER_POOL = ThreadPoolExecutor(max_workers=COVER_FETCH_WORKERS, thread_name_prefix="cover-fetch")
+# (connect, read) seconds: an unreachable host fails fast without cutting off slow large covers
+COVER_FETCH_TIMEOUT = (3, 10)
+# Covers render at 200x300 CSS pixels; keep 2x for high-DPI screens
+COVER_THUMBNAIL_SIZE = (400, 600)
+COVER_CACHE_ENTRIES = 512
+DIRECT_COVER_URLS = load_config()["app"]["direct_cover_urls"]
+# MangaDex serves downscaled copies of every cover next to the original; 512px wide covers
+# the 400px display thumbnail at a fraction of the original's size
+MANGADEX_COVER_PREFIX = "https://uploads.mangadex.org/covers/"
+MANGADEX_COVER_VARIANT = ".512.jpg"
+
+
+def cover_thumbnail_url(url):
+    """Point a MangaDex cover URL at its 512px CDN thumbnail; other URLs are returned unchanged."""
+    if url.startswith(MANGADEX_COVER_PREFIX) and not url.endswith((".512.jpg", ".256.jpg")):
+        return url + MANGADEX_COVER_VARIANT
+    return url
+
+
+def _download_cover(url):
+    """Download one cover's bytes, raising on network or HTTP errors (makes no st calls)."""
+    response = _HTTP.get(url, timeout=COVER_FETCH_TIMEOUT)
+    response.raise_for_status()
+    return response.content
+
+
+def _report_cover_error(error):
+    """Report a failed cover download in the app."""
+    if isinstance(error, requests.HTTPError):
+        st.warning(f"Cannot parse image: {error.response.status_code}")
+    else:
+        st.error(f"Error when fetching image: {error}")
+
+
+def image_to_data_uri(image_bytes, mime_type="image/webp"):
+    """Encode image bytes as a data URI, building it as bytes and decoding only once."""
+    return (b"data:" + mime_type.encode("ascii") + b";base64," + base64.b64encode(image_bytes)).decode("ascii")
+
+
+def to_cover_thumbnail(image_bytes):
+    """Downscale a full-size cover to display size and re-encode it as WebP."""
+    image = Image.open(BytesIO(image_bytes)).convert("RGB")
+    image.thumbnail(COVER_THUMBNAIL_SIZE, Image.LANCZOS)
+    buffer = BytesIO()
+    image.save(buffer, format="WEBP", quality=75, method=6)
+    return buffer.getvalue()
+
+
+@st.cache_data(persist="disk", max_entries=COVER_CACHE_ENTRIES, show_spinner=False)
+def get_cover_data_uri(url):
+    """Download a cover and return it as a WebP thumbnail data URI, persisted on disk by URL."""
+    # Failures raise instead of returning None, so they are retried rather than cached
+    return image_to_data_uri(to_cover_thumbnail(_download_cover(cover_thumbnail_url(url))))
+
+
+def _cover_data_uri_or_error(ctx):
+    """Build a pool task that loads one cover data URI, returning the error instead of raising it."""
+    def attempt(url):
+        # Cached calls expect a script run context, which pool threads do not have
+        add_script_run_ctx(threading.current_thread(), ctx)
+        try:
+            return get_cover_data_uri(url)
+        except Exception as e:
+            return e
+    return attempt
+
+
+def load_cover_data_uri_batch(urls):
+    """Load several cover data URIs concurrently, returning them (or None) in input order."""
+    if not urls:
+        return []
+    results = list(_COVER_POOL.map(_cover_data_uri_or_error(get_script_run_ctx()), urls))
+
+    # Streamlit elements must be written from the script thread, so failures are reported here
+    covers = []
+    for result in results:
+        if isinstance(result, Exception):
+            _report_cover_error(result)
+            covers.append(None)
         else:
-            st.warning(f"Cannot parse image: {response.status_code}")
-            return None
-    except Exception as e:
-        st.error(f"Error when fetching image: {e}")
-        return None
-
-
-def image_to_base64(image_bytes):
-    return base64.b64encode(image_bytes).decode("utf-8")
+            covers.append(result)
+    return covers
+
+
+def prefetch_cover_data_uris(urls):
+    """Warm the cover cache in the background without waiting; failures are retried when shown."""
+    attempt = _cover_data_uri_or_error(get_script_run_ctx())
+    for url in urls:
+        _COVER_POOL.submit(attempt, url)
+
+
+def format_genres(genres):
+    """Format a cover's genres for its tooltip, showing at most 3."""
+    # genres arrives as a text[] from genres_clean, so no JSON parsing is needed
+    if not pd.api.types.is_list_like(genres) or len(genres) == 0:
+        return "Unknown"
+    genres = list(genres)
+    genres_str = ", ".join(genres[:3])
+    if len(genres) > 3:
+        genres_str += f" +{len(genres) - 3} more"
+    return genres_str
+
+
+def format_genres_column(genres):
+    """Format a whole column of genre lists like format_genres, in one Arrow pass instead of per row."""
+    # Typed explicitly: a sample whose arrays are all empty would otherwise infer list<null>,
+    # which binary_join has no kernel for
+    arr = pa.array(genres, type=pa.list_(pa.string()))
+    lengths = pd.Series(pc.fill_null(pc.list_value_length(arr), 0).to_numpy(), index=genres.index)
+    shown = pd.Series(pc.fill_null(pc.binary_join(pc.list_slice(arr, 0, 3), ", "), "").to_pylist(),
+                      index=genres.index)
+    hidden = lengths - 3
+    formatted = shown.where(hidden <= 0, shown + " +" + hidden.astype(str) + " more")
+    return formatted.where(lengths > 0, "Unknown")
+
+
+# Tooltip markup shared by the carousel and the single cover; label colours come from styles.css
+COVER_TOOLTIP_TEMPLATE = """
+<div class="tooltip-section">
+    <span class="tooltip-label title">Title:</span>
+    <span class="tooltip-value">{title}</span>
+</div>
+<div class="tooltip-section">
+    <span class="tooltip-label status">Status:</span>
+    <span class="status-badge {status_class}">{status}</span>
+</div>
+<div class="tooltip-section">
+    <span class="tooltip-label genres">Genres:</span>
+    <span class="tooltip-value">{genres}</span>
+</div>
+<div class="tooltip-section">
+    <span class="tooltip-label published">Published:</span>
+    <span class="tooltip-value">{published_year}</span>
+</div>
+"""
+STATUS_BADGE_CLASSES = {
+    'ongoing': "status-ongoing",
+    'completed': "status-completed",
+    'hiatus': "status-hiatus",
+    'cancelled': "status-cancelled",
+}
+
+
+def status_badge_class(status):
+    """Return the badge CSS class for a status, defaulting to the ongoing styling."""
+    return STATUS_BADGE_CLASSES.get(status.lower(), "status-ongoing")
+
+
+@lru_cache(maxsize=4096)
+def _render_tooltip(title, status, genres_str, published_year):
+    return COVER_TOOLTIP_TEMPLATE.format(
+        title=title,
+        status=status,
+        status_class=status_badge_class(status),
+        genres=genres_str,
+        published_year=published_year
+    )
+
+
+def build_cover_tooltip(cover):
+    """Render the tooltip HTML for one cover row, reusing it when the same cover comes up again."""
+    return _render_tooltip(
+        cover['title'],
+        cover.get('status') or 'Unknown',
+        format_genres(cover.get('genres')),
+        cover.get('published_year', 'Unknown')
+    )
+
+
+def prepare_cover_rows(manga_df, n=9):
+    """Precompute the display fields of each cover once, so carousel paging only slices and emits."""
+    # Rows arrive already randomly sampled and filtered to valid cover URLs by the query
+    covers = manga_df.head(n)[['title', 'cover_url', 'status', 'genres', 'published_year']]
+    status = covers['status'].fillna('Unknown')
+    genres_str = format_genres_column(covers['genres'])
+    tooltip_html = [
+        _render_tooltip(title, row_status, row_genres, year)
+        for title, row_status, row_genres, year
+        in zip(covers['title'], status, genres_str, covers['published_year'])
+    ]
+    # Everything after the image source is fixed per cover, so each card is rendered here once
+    card_tail = [
+        f'" alt="{title}" loading="lazy" referrerpolicy="no-referrer">'
+        f'<div class="cover-tooltip">{tooltip}</div>'
+        f'<div class="cover-caption">{title}</div>'
+        f'</div>'
+        for title, tooltip in zip(covers['title'], tooltip_html)
+    ]
+    return covers.assign(tooltip_html=tooltip_html, card_tail=card_tail).to_dict('records')
+
+
+def cover_image_srcs(urls):
+    """Return the <img src> for several covers, fetching any data URIs concurrently."""
+    if DIRECT_COVER_URLS:
+        return [cover_thumbnail_url(url) for url in urls]
+    return load_cover_data_uri_batch(urls)
+
+
+def _page_covers(step, max_index):
+    """Move the carousel by one page before the fragment reruns, so the click shows at once."""
+    st.session_state['cover_index'] = min(max_index, max(0, st.session_state['cover_index'] + step))
 
 
 @st.fragment
@@ -43,20 +254,13 @@ def display_random_cover_images(manga_df):
     """Display a carousel of 3 random manga cover images from a selection of 9,
     with enhanced navigation arrows, smooth animations, and hover tooltips."""
 
-    # Filter manga with valid cover URLs
-    manga_df['genres'] = manga_df['genres'].apply(lambda x: tuple(x) if isinstance(x, list) else x)
-    valid_manga = manga_df[manga_df['cover_url'].notna() & (manga_df['cover_url'] != '')][
-        ['title', 'cover_url', 'status', 'genres', 'published_year']]
-
-    if valid_manga.empty:
+    if manga_df.empty:
         st.info("No cover images available for the selected filters.")
         return
 
     # Initialize session state for carousel
     if 'selected_covers' not in st.session_state or st.session_state.get('manga_filters_changed'):
-        # Select 10 random manga
-        num_to_select = min(9, len(valid_manga))
-        st.session_state['selected_covers'] = valid_manga.sample(n=num_to_select, random_state=None).to_dict('records')
+        st.session_state['selected_covers'] = prepare_cover_rows(manga_df)
         st.session_state['cover_index'] = 0
         st.session_state['manga_filters_changed'] = False
 
@@ -70,8 +274,7 @@ def display_random_cover_images(manga_df):
     with col_nav_left:
         # Enhanced left arrow
         if index > 0:
-            if st.button("‹", key="cover_prev", help="Previous covers"):
-                st.session_state['cover_index'] = max(0, index - 3)
+            st.button("‹", key="cover_prev", help="Previous covers", on_click=_page_covers, args=(-3, max_index))
         else:
             st.markdown('<div class="carousel-nav disabled">‹</div>', unsafe_allow_html=True)
 
@@ -80,72 +283,31 @@ def display_random_cover_images(manga_df):
             # Get current 3 covers
             current_covers = covers[index:index + 3]
 
-            cols = st.columns(3)
-            for idx, cover in enumerate(current_covers):
-                with cols[idx]:
-                    # Parse genres
-                    try:
-                        if isinstance(cover['genres'], str):
-                            genres = [g['value'] for g in json.loads(cover['genres'])] if cover['genres'] else []
-                        else:
-                            genres = cover['genres'] if cover['genres'] else []
-                        genres_str = ", ".join(genres[:3]) if genres else "Unknown"
-                        if len(genres) > 3:
-                            genres_str += f" +{len(genres) - 3} more"
-                    except Exception:
-                        genres_str = "Unknown"
-
-                    # Format status with badge
-                    status = cover.get('status', 'Unknown').lower()
-                    status_class = f"status-{status.replace(' ', '-')}"
-                    if status not in ['ongoing', 'completed', 'hiatus', 'cancelled']:
-                        status_class = "status-ongoing"  # Default styling
-
-                    # Format tooltip content to match load_and_display_cover
-                    tooltip_content = f"""
-                    <div class="tooltip-section">
-                        <span class="tooltip-label" style="color: #64b5f6;">Title:</span>
-                        <span class="tooltip-value">{cover['title']}</span>
-                    </div>
-                    <div class="tooltip-section">
-                        <span class="tooltip-label" style="color: #81c784;">Status:</span>
-                        <span class="status-badge {status_class}">{cover.get('status', 'Unknown')}</span>
-                    </div>
-                    <div class="tooltip-section">
-                        <span class="tooltip-label" style="color: #ffb74d;">Genres:</span>
-                        <span class="tooltip-value">{genres_str}</span>
-                    </div>
-                    <div class="tooltip-section">
-                        <span class="tooltip-label" style="color: #f48fb1;">Published:</span>
-                        <span class="tooltip-value">{cover.get('published_year', 'Unknown')}</span>
-                    </div>
-                    """
-
-                    # Display enhanced cover with tooltip
-                    image_bytes = fetch_cover_image(cover["cover_url"])
-                    if image_bytes is not None:
-                        img_base64 = image_to_base64(image_bytes)
-                        st.markdown(
-                            f"""
-                            <div class="cover-item">
-                                <img src="data:image/jpeg;base64,{img_base64}" alt="{cover['title']}" loading="lazy">
-                                <div class="cover-tooltip">{tooltip_content}</div>
-                                <div class="cover-caption">{cover['title']}</div>
-                            </div>
-                            """,
-                            unsafe_allow_html=True
-                        )
+            # Download the visible covers together before rendering any of them
+            cover_images = cover_image_srcs([cover["cover_url"] for cover in current_covers])
+            # Start downloading the next page now, so paging forward reads it from the cache
+            if not DIRECT_COVER_URLS:
+                prefetch_cover_data_uris([cover["cover_url"] for cover in covers[index + 3:index + 6]])
+
+            # Cards were rendered when the covers were sampled; only the image source is filled in here,
+            # and all visible cards go to the frontend in one markdown call
+            cards = "".join(
+                f'<div class="cover-item"><img src="{img_src}{cover["card_tail"]}'
+                for cover, img_src in zip(current_covers, cover_images)
+                if img_src is not None
+            )
+            st.markdown(f'<div class="cover-row">{cards}</div>', unsafe_allow_html=True)
 
             # Add carousel indicators
             if len(covers) > 3:
                 total_pages = (len(covers) + 2) // 3  # Ceiling division
                 current_page = index // 3
 
-                indicators_html = '<div class="carousel-indicators">'
-                for i in range(total_pages):
-                    active_class = "active" if i == current_page else ""
-                    indicators_html += f'<div class="indicator-dot {active_class}"></div>'
-                indicators_html += '</div>'
+                dots = "".join(
+                    f'<div class="indicator-dot {"active" if i == current_page else ""}"></div>'
+                    for i in range(total_pages)
+                )
+                indicators_html = f'<div class="carousel-indicators">{dots}</div>'
 
                 st.markdown(indicators_html, unsafe_allow_html=True)
         else:
@@ -154,91 +316,67 @@ def display_random_cover_images(manga_df):
     with col_nav_right:
         # Enhanced right arrow
         if index < max_index:
-            if st.button("›", key="cover_next", help="Next covers"):
-                st.session_state['cover_index'] = min(max_index, index + 3)
-                # st.rerun()
+            st.button("›", key="cover_next", help="Next covers", on_click=_page_covers, args=(3, max_index))
         else:
             st.markdown('<div class="carousel-nav disabled">›</div>', unsafe_allow_html=True)
 
-    st.markdown('</div>', unsafe_allow_html=True)
+
+@st.cache_data(ttl=3600, max_entries=COVER_CACHE_ENTRIES, show_spinner=False)
+def build_cover_html(selected_manga):
+    """Build the selected manga's cover card markup, or "" when it has no cover.
+
+    Makes no st calls, so a cache hit skips the query, the download and the encode entirely;
+    failures raise and are therefore retried instead of cached.
+    """
+    engine = get_postgres_engine()
+    # Enhanced query to get more manga details for tooltip; the cover check and the single-row
+    # limit run in SQL, and the row is read as a mapping without building a DataFrame
+    query = """
+    SELECT title, cover_url, status, genres_clean as genres, published_year
+    FROM manga
+    WHERE title = :title AND cover_url IS NOT NULL AND cover_url <> ''
+    LIMIT 1
+    """
+    with engine.connect() as conn:
+        manga_data = conn.execute(sql_text(query), {'title': selected_manga}).mappings().first()
+
+    if manga_data is None:
+        return ""
+
+    # Fetch the image first so a failed download skips the tooltip work entirely
+    if DIRECT_COVER_URLS:
+        img_src = cover_thumbnail_url(manga_data["cover_url"])
+    else:
+        img_src = get_cover_data_uri(manga_data["cover_url"])
+
+    tooltip_content = build_cover_tooltip(manga_data)
+
+    return f"""
+    <div class="single-cover-item">
+        <img src="{img_src}" alt="{manga_data['title']}" loading="lazy" referrerpolicy="no-referrer">
+        <div class="single-cover-tooltip">{tooltip_content}</div>
+        <div class="single-cover-caption">{manga_data['title']}</div>
+    </div>
+    """
 
 
-@st.cache_data(ttl=3600, show_spinner=False)
 def load_and_display_cover(selected_manga=None):
     """Load and display cover image for the selected manga with enhanced styling and tooltip."""
-    engine = get_postgres_engine()
-    if not selected_manga or not engine:
+    if not selected_manga or not get_postgres_engine():
         return None
 
     try:
-        # Enhanced query to get more manga details for tooltip
-        query = """
-        SELECT title, cover_url, status, genres, published_year
-        FROM manga
-        WHERE title = :title
-        """
-        with engine.connect() as conn:
-            results = conn.execute(text(query), {'title': selected_manga})
-            df = pd.DataFrame(results.fetchall())
-
-        if df.empty or df['cover_url'].iloc[0] is None or df['cover_url'].iloc[0] == '':
-            st.info("📚 No cover image available for the selected manga.")
-            return None
-
-        manga_data = df.iloc[0].to_dict()
-
-        # Parse genres for tooltip
-        try:
-            if isinstance(manga_data.get('genres'), str):
-                genres = [g['value'] for g in json.loads(manga_data['genres'])] if manga_data.get('genres') else []
-            else:
-                genres = manga_data.get('genres', []) if manga_data.get('genres') else []
-            genres_str = ", ".join(genres[:3]) if genres else "Unknown"  # Limit to 3 genres for cleaner display
-            if len(genres) > 3:
-                genres_str += f" +{len(genres) - 3} more"
-        except Exception:
-            genres_str = "Unknown"
-
-        # Format status with badge
-        status = manga_data.get('status', 'Unknown').lower()
-        status_class = f"status-{status.replace(' ', '-')}"
-        if status not in ['ongoing', 'completed', 'hiatus', 'cancelled']:
-            status_class = "status-ongoing"  # Default styling
-
-        # Create enhanced tooltip content
-        tooltip_content = f"""
-        <div class="tooltip-section">
-            <span class="tooltip-label title">Title:</span>
-            <span class="tooltip-value">{manga_data['title']}</span>
-        </div>
-        <div class="tooltip-section">
-            <span class="tooltip-label status">Status:</span>
-            <span class="status-badge {status_class}">{manga_data.get('status', 'Unknown')}</span>
-        </div>
-        <div class="tooltip-section">
-            <span class="tooltip-label genres">Genres:</span>
-            <span class="tooltip-value">{genres_str}</span>
-        </div>
-        <div class="tooltip-section">
-            <span class="tooltip-label published">Published:</span>
-            <span class="tooltip-value">{manga_data.get('published_year', 'Unknown')}</span>
-        </div>
-        """
-
-        # Display the enhanced cover
-        image_bytes = fetch_cover_image(manga_data["cover_url"])
-        if image_bytes:
-            img_base64 = image_to_base64(image_bytes)
-            cover_html = f"""
-            <div class="single-cover-item">
-                <img src="data:image/jpeg;base64,{img_base64}" alt="{manga_data['title']}" loading="lazy">
-                <div class="single-cover-tooltip">{tooltip_content}</div>
-                <div class="single-cover-caption">{manga_data['title']}</div>
-            </div>
-            """
-
-            st.markdown(cover_html, unsafe_allow_html=True)
-
+        # The cache key is always the plain title string, which st.cache_data hashes cheaply
+        cover_html = build_cover_html(str(selected_manga))
+    except requests.RequestException as e:
+        _report_cover_error(e)
+        return None
     except Exception as e:
         st.error(f"❌ Error loading cover: {str(e)}")
         return None
+
+    if not cover_html:
+        st.info("📚 No cover image available for the selected manga.")
+        return None
+
+    st.markdown(cover_html, unsafe_allow_html=True)
@@ -1,8 +1,16 @@
 import streamlit as st
 import pandas as pd
-import base64
 import io
 import zipfile
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+import plotly.io as pio
+from concurrent.futures import ThreadPoolExecutor
+
+# Above this many rows the Excel writer's per-cell objects dominate export time, so CSV is served instead
+EXCEL_MAX_ROWS = 100_000
+CHART_EXPORT_WORKERS = 8
 
 
 def format_number(number):
@@ -10,37 +18,87 @@ def format_number(number):
     return f"{number:,}"
 
 
+def to_csv_buffer(df):
+    """Serialize a frame to CSV with Arrow's vectorized writer, or pandas for columns Arrow cannot write."""
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        pacsv.write_csv(table, sink)
+        return sink.getvalue()
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+        # Arrow's CSV writer rejects nested types such as list columns
+        return df.to_csv(index=False).encode()
+
+
+def to_csv_bytes(df):
+    return bytes(to_csv_buffer(df))
+
+
+def to_excel_bytes(df):
+    # xlsxwriter's constant_memory mode is not used: to_excel writes column by column,
+    # and that mode drops any cell above the last row written
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        df.to_excel(writer, index=False, sheet_name='Sheet1')
+    return output.getvalue()
+
+
+def to_parquet_bytes(df):
+    # Written into a native Arrow buffer rather than a BytesIO that grows by reallocating and copying
+    sink = pa.BufferOutputStream()
+    # zstd is smaller than the default snappy and much faster than gzip
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), sink, compression="zstd")
+    return sink.getvalue().to_pybytes()
+
+
+# format_type -> (button label, file extension, MIME type, serializer)
+EXPORT_FORMATS = {
+    "csv": ("Download CSV", "csv", "text/csv", to_csv_bytes),
+    "excel": ("Download Excel", "xlsx",
+              "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", to_excel_bytes),
+    "parquet": ("Download Parquet", "parquet", "application/octet-stream", to_parquet_bytes),
+}
+
+
 def export_data(df, filename, format_type):
-    """Export data in multiple formats."""
+    """Render a download button for the data in the given format."""
+    if format_type == "excel" and len(df) > EXCEL_MAX_ROWS:
+        format_type = "csv"
     try:
-        if format_type == "csv":
-            csv = df.to_csv(index=False)
-            b64 = base64.b64encode(csv.encode()).decode()
-            return f'<a href="data:file/csv;base64,{b64}" download="{filename}.csv">Download CSV</a>'
-        elif format_type == "excel":
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                df.to_excel(writer, index=False, sheet_name='Sheet1')
-            b64 = base64.b64encode(output.getvalue()).decode()
-            return (f'<a href="data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,{b64}" '
-                    f'download="{filename}.xlsx">Download Excel</a>')
-        elif format_type == "parquet":
-            output = io.BytesIO()
-            df.to_parquet(output, index=False)
-            b64 = base64.b64encode(output.getvalue()).decode()
-            return (f'<a href="data:application/octet-stream;base64,{b64}" '
-                    f'download="{filename}.parquet">Download Parquet</a>')
+        label, extension, mime, serialize = EXPORT_FORMATS[format_type]
+        data = serialize(df)
     except Exception as e:
         st.error(f"Error exporting data: {str(e)}")
-        return ""
+        return
+    # Served as a file rather than inlined as a base64 data URI, and clicking it does not rerun the app
+    st.download_button(label, data=data, file_name=f"{filename}.{extension}", mime=mime, on_click="ignore")
 
 
-def export_charts(charts, filename):
-    """Export all charts as PNGs in a ZIP file."""
+def _render_png(fig):
+    return pio.to_image(fig, format="png")
+
+
+def charts_to_zip_bytes(charts):
+    """Render all charts as PNGs and pack them into a ZIP file."""
+    # All renders go to plotly's one shared Kaleido process, so it starts at most once per export;
+    # the threads overlap the Python-side figure serialization with the renderer
+    with ThreadPoolExecutor(max_workers=min(CHART_EXPORT_WORKERS, len(charts) or 1)) as executor:
+        pngs = list(executor.map(_render_png, charts.values()))
+
     output = io.BytesIO()
-    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as zf:
-        for i, (chart_name, fig) in enumerate(charts.items()):
-            img_bytes = fig.write_image(format="png")
+    # PNGs are already deflate-compressed, so storing them skips a second pass that saves nothing
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_STORED) as zf:
+        for chart_name, img_bytes in zip(charts, pngs):
             zf.writestr(f"{chart_name}.png", img_bytes)
-    b64 = base64.b64encode(output.getvalue()).decode()
-    return f'<a href="data:application/zip;base64,{b64}" download="{filename}.zip">Download All Charts (ZIP)</a>'
+    return output.getvalue()
+
+
+def export_charts(charts, filename):
+    """Render a download button for all charts as PNGs in a ZIP file."""
+    try:
+        data = charts_to_zip_bytes(charts)
+    except Exception as e:
+        st.error(f"Error exporting charts: {str(e)}")
+        return
+    st.download_button("Download All Charts (ZIP)", data=data, file_name=f"{filename}.zip",
+                       mime="application/zip", on_click="ignore")
@@ -0,0 +1,84 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class FrozenFilters:
+    """Immutable, hashable view of the manga filters selected in the sidebar."""
+    status: tuple = ()
+    genres: tuple = ()
+    original_language: tuple = ()
+    year_range: tuple = ()
+    include_null_year: bool = False
+    title: str = None
+
+    def __bool__(self):
+        return bool(self.status or self.genres or self.original_language
+                    or self.year_range or self.include_null_year or self.title)
+
+
+def _normalize_values(values):
+    """Strip, de-duplicate and sort selected values, dropping empty entries."""
+    return tuple(sorted({str(v).strip() for v in values or () if v is not None and str(v).strip()}))
+
+
+def freeze_filters(manga_filters, year_bounds=None):
+    """Validate the raw filter dict once and freeze it into canonical sorted tuples.
+
+    A year filter that spans all of year_bounds and includes null years selects every manga,
+    so it is dropped and unfiltered views can use their precomputed paths.
+    """
+    if not manga_filters:
+        return FrozenFilters()
+
+    published_year = manga_filters.get('published_year') or {}
+    year_range = published_year.get('year_range')
+    if (year_bounds and year_range and published_year.get('include_null')
+            and min(year_range) <= year_bounds[0] and max(year_range) >= year_bounds[1]):
+        published_year, year_range = {}, None
+    title = manga_filters.get('title')
+    # Values are matched exactly in SQL, so they are not case-folded here
+    return FrozenFilters(
+        status=_normalize_values(manga_filters.get('status')),
+        genres=_normalize_values(manga_filters.get('genres')),
+        original_language=_normalize_values(manga_filters.get('original_language')),
+        year_range=tuple(sorted(int(y) for y in year_range)) if year_range else (),
+        include_null_year=bool(published_year.get('include_null')),
+        title=title.strip() if isinstance(title, str) and title.strip() else None
+    )
+
+
+def build_manga_where(filters, alias="m"):
+    """Build the WHERE clause and bind parameters for the given frozen filters."""
+    col = f"{alias}." if alias else ""
+    params = {}
+    conditions = []
+    if not filters:
+        return "", params
+
+    if filters.year_range:
+        if filters.include_null_year:
+            conditions.append(
+                f"({col}published_year BETWEEN :year_min AND :year_max OR {col}published_year IS NULL)")
+        else:
+            conditions.append(f"{col}published_year BETWEEN :year_min AND :year_max")
+        params['year_min'] = filters.year_range[0]
+        params['year_max'] = filters.year_range[1]
+    elif filters.include_null_year:
+        conditions.append(f"{col}published_year IS NULL")
+
+    # Lists bind as a single Postgres array, so the SQL text is the same for any number of values
+    if filters.genres:
+        conditions.append(f"{col}genres_clean && CAST(:genres AS TEXT[])")
+        params['genres'] = list(filters.genres)
+    if filters.status:
+        conditions.append(f"{col}status = ANY(:statuses)")
+        params['statuses'] = list(filters.status)
+    if filters.original_language:
+        conditions.append(f"{col}original_language = ANY(:langs)")
+        params['langs'] = list(filters.original_language)
+    if filters.title:
+        conditions.append(f"{col}title = :title")
+        params['title'] = filters.title
+
+    where_clause = " WHERE " + " AND ".join(conditions) if conditions else ""
+    return where_clause, params
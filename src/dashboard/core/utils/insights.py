@@ -1,68 +1,18 @@
-from src.dashboard.core.database.postgres import get_postgres_engine
+from src.dashboard.core.database.postgres import get_postgres_engine, sql_text
 import streamlit as st
-import pandas as pd
-from sqlalchemy import text
+from src.dashboard.core.utils.filters import freeze_filters, build_manga_where
 from langchain_google_genai import ChatGoogleGenerativeAI
 from dotenv import load_dotenv
 import os
 import re
-import json
+import orjson
 from tavily import TavilyClient
 
 
 load_dotenv()
 GEMINI_MODEL = "gemini-2.0-flash-lite"
-
-
-def get_filtered_manga_count(manga_filters):
-    """Return the count of manga matching the filters and total manga count."""
-    engine = get_postgres_engine()
-    if not engine:
-        return 0, 0
-    try:
-        params = {}
-        conditions = []
-        if manga_filters:
-            for k, v in manga_filters.items():
-                if k == 'published_year' and v.get('year_range'):
-                    if v['include_null']:
-                        conditions.append("(published_year BETWEEN :year_min AND :year_max OR published_year IS NULL)")
-                    else:
-                        conditions.append("published_year BETWEEN :year_min AND :year_max")
-                    params['year_min'] = v['year_range'][0]
-                    params['year_max'] = v['year_range'][1]
-                elif k == 'genres' and not v:
-                    placeholders = ','.join([f':g{i}' for i in range(len(v))])
-                    conditions.append(f"EXISTS (SELECT 1 FROM unnest(genres) g WHERE g IN ({placeholders}))")
-                    for i, val in enumerate(v):
-                        params[f'g{i}'] = val
-                elif k == 'status' and v:
-                    placeholders = ','.join([f':s{i}' for i in range(len(v))])
-                    conditions.append(f"status IN ({placeholders})")
-                    for i, val in enumerate(v):
-                        params[f's{i}'] = val
-                elif k == 'original_language' and v:
-                    placeholders = ','.join([f':ol{i}' for i in range(len(v))])
-                    conditions.append(f"original_language IN ({placeholders})")
-                    for i, val in enumerate(v):
-                        params[f'ol{i}'] = val
-                elif k == 'title' and v:
-                    conditions.append("title = :title")
-                    params['title'] = v
-
-        where_clause = " WHERE " + " AND ".join(conditions) if conditions else ""
-        query = f"SELECT COUNT(*) as count FROM manga {where_clause}"
-        total_query = "SELECT COUNT(*) as count FROM manga"
-        with engine.connect() as conn:
-            filter_results = conn.execute(text(query), params)
-            total_results = conn.execute(text(total_query))
-            filtered_count = pd.DataFrame(filter_results.fetchall(), columns=filter_results.keys())['count'].iloc[0]
-            total_count = pd.DataFrame(total_results.fetchall(), columns=total_results.keys())['count'].iloc[0]
-
-        return int(filtered_count), int(total_count)
-    except Exception as e:
-        st.error(f"Error counting filtered manga: {str(e)}")
-        return 0, 0
+# Upper bound on the summary query, so a slow scan cannot hold the insights panel indefinitely
+SUMMARY_STATEMENT_TIMEOUT_MS = 10_000
 
 
 def summarize_filtered_data(manga_filters=None):
@@ -71,151 +21,115 @@ def summarize_filtered_data(manga_filters=None):
     if not engine:
         return None
 
-    summary = {}
-    params = {}
-    conditions = []
-    if manga_filters:
-        for k, v in manga_filters.items():
-            if k == 'published_year' and v.get('year_range'):
-                if v['include_null']:
-                    conditions.append("(published_year BETWEEN :year_min AND :year_max OR published_year IS NULL)")
-                else:
-                    conditions.append("published_year BETWEEN :year_min AND :year_max")
-                params['year_min'] = v['year_range'][0]
-                params['year_max'] = v['year_range'][1]
-            elif k == 'genres' and v:
-                placeholders = ','.join([f':g{i}' for i in range(len(v))])
-                conditions.append(f"EXISTS (SELECT 1 FROM unnest(genres) g WHERE g IN ({placeholders}))")
-                for i, val in enumerate(v):
-                    params[f'g{i}'] = val
-            elif k == 'status' and v:
-                placeholders = ','.join([f':s{i}' for i in range(len(v))])
-                conditions.append(f"status IN ({placeholders})")
-                for i, val in enumerate(v):
-                    params[f's{i}'] = val
-            elif k == 'original_language' and v:
-                placeholders = ','.join([f':ol{i}' for i in range(len(v))])
-                conditions.append(f"original_language IN ({placeholders})")
-                for i, val in enumerate(v):
-                    params[f'ol{i}'] = val
-    manga_where = " WHERE " + " AND ".join(conditions) if conditions else ""
+    # Shared builder: each list filter binds as one array parameter, so the SQL text is stable
+    manga_where, params = build_manga_where(freeze_filters(manga_filters))
+    # Every statistic comes back from one round-trip as rows tagged by kind, scanning the filtered
+    # manga once; label/detail carry text values and year/value the numbers
+    query = f"""
+    WITH fm AS MATERIALIZED (
+        SELECT m.manga_id, m.title, m.status, m.original_language, m.published_year, m.genres_clean, m.updated_at
+        FROM manga m
+        {manga_where}
+    )
+    SELECT 'total' as kind, NULL::text as label, NULL::text as detail, NULL::int as year, COUNT(*) as value
+    FROM fm
+    UNION ALL
+    SELECT 'total_all', NULL, NULL, NULL, COUNT(*)
+    FROM manga
+    UNION ALL
+    SELECT 'chapters', NULL, NULL, NULL, COUNT(*)
+    FROM chapter c
+    JOIN fm ON c.manga_id = fm.manga_id
+    UNION ALL
+    (SELECT 'genre', g, NULL, NULL, COUNT(*)
+     FROM fm, unnest(fm.genres_clean) g
+     GROUP BY g
+     ORDER BY COUNT(*) DESC
+     LIMIT 3)
+    UNION ALL
+    (SELECT 'status', status, NULL, NULL, COUNT(*)
+     FROM fm
+     GROUP BY status
+     ORDER BY COUNT(*) DESC
+     LIMIT 3)
+    UNION ALL
+    (SELECT 'language', original_language, NULL, NULL, COUNT(*)
+     FROM fm
+     GROUP BY original_language
+     ORDER BY COUNT(*) DESC
+     LIMIT 3)
+    UNION ALL
+    SELECT 'year_min', NULL, NULL, MIN(published_year), NULL
+    FROM fm
+    UNION ALL
+    SELECT 'year_max', NULL, NULL, MAX(published_year), NULL
+    FROM fm
+    UNION ALL
+    (SELECT 'top_year', NULL, NULL, published_year, COUNT(*)
+     FROM fm
+     GROUP BY published_year
+     ORDER BY COUNT(*) DESC
+     LIMIT 2)
+    UNION ALL
+    (SELECT 'recent_update', title, to_char(updated_at, 'YYYY-MM-DD'), NULL, NULL
+     FROM fm
+     ORDER BY updated_at DESC
+     LIMIT 1)
+    UNION ALL
+    (SELECT 'most_chapters', fm.title, NULL, NULL, COUNT(c.chapter_id)
+     FROM fm
+     LEFT JOIN chapter c ON fm.manga_id = c.manga_id
+     GROUP BY fm.title
+     ORDER BY COUNT(c.chapter_id) DESC
+     LIMIT 1)
+    """
 
     try:
         with engine.connect() as conn:
-            # Total counts
-            filtered_count, total_manga = get_filtered_manga_count(manga_filters)
-            summary['total_manga'] = filtered_count
-            summary['total_manga_all'] = total_manga
-            query = f"SELECT COUNT(*) as count FROM chapter c JOIN manga m ON c.manga_id = m.manga_id {manga_where}"
-            total_chapters = pd.DataFrame(conn.execute(text(query), params).fetchall())['count'].iloc[0]
-            summary['total_chapters'] = int(total_chapters)
-
-            # Top genres
-            query = f"""
-            SELECT trim(g) as genre, COUNT(*) as count
-            FROM manga m, unnest(genres) g
-            {manga_where}
-            GROUP BY genre
-            ORDER BY count DESC
-            LIMIT 3
-            """
-            df = pd.DataFrame(conn.execute(text(query), params).fetchall())
-            summary['genres'] = [
-                {'name': row['genre'], 'count': int(row['count']), 'percent': (row['count'] / filtered_count * 100) if filtered_count else 0}
-                for _, row in df.iterrows()
-            ]
-
-            # Top statuses
-            query = f"""
-            SELECT m.status, COUNT(*) as count
-            FROM manga m
-            {manga_where}
-            GROUP BY m.status
-            ORDER BY count DESC
-            LIMIT 3
-            """
-            df = pd.DataFrame(conn.execute(text(query), params).fetchall())
-            summary['statuses'] = [
-                {'name': row['status'], 'count': int(row['count']), 'percent': (row['count'] / filtered_count * 100) if filtered_count else 0}
-                for _, row in df.iterrows()
-            ]
-
-            # Top original languages
-            query = f"""
-            SELECT m.original_language, COUNT(*) as count
-            FROM manga m
-            {manga_where}
-            GROUP BY m.original_language
-            ORDER BY count DESC
-            LIMIT 3
-            """
-            df = pd.DataFrame(conn.execute(text(query), params).fetchall())
-            summary['original_languages'] = [
-                {'name': row['original_language'], 'count': int(row['count']), 'percent': (row['count'] / filtered_count * 100) if filtered_count else 0}
-                for _, row in df.iterrows()
-            ]
-
-            # Publication years
-            query = f"""
-            SELECT MIN(published_year) as min_year, MAX(published_year) as max_year
-            FROM manga m
-            {manga_where}
-            """
-            df = pd.DataFrame(conn.execute(text(query), params).fetchall())
-            summary['year_range'] = {
-                'min': int(df['min_year'].iloc[0]) if pd.notna(df['min_year'].iloc[0]) else None,
-                'max': int(df['max_year'].iloc[0]) if pd.notna(df['max_year'].iloc[0]) else None
-            }
-            query = f"""
-            SELECT published_year, COUNT(*) as count
-            FROM manga m
-            {manga_where}
-            GROUP BY published_year
-            ORDER BY count DESC
-            LIMIT 2
-            """
-            df = pd.DataFrame(conn.execute(text(query), params).fetchall())
-            summary['top_years'] = [
-                {'year': int(row['published_year']) if pd.notna(row['published_year']) else 'NULL', 'count': int(row['count'])}
-                for _, row in df.iterrows()
-            ]
-
-            # Most recent update
-            query = f"""
-            SELECT m.title, m.updated_at
-            FROM manga m
-            {manga_where}
-            ORDER BY m.updated_at DESC
-            LIMIT 1
-            """
-            df = pd.DataFrame(conn.execute(text(query), params).fetchall())
-            if not df.empty:
-                summary['recent_update'] = {
-                    'title': df['title'].iloc[0],
-                    'date': df['updated_at'].iloc[0].strftime('%Y-%m-%d')
-                }
-
-            # Manga with most chapters
-            query = f"""
-            SELECT m.title, COUNT(c.chapter_id) as count
-            FROM manga m
-            LEFT JOIN chapter c ON m.manga_id = c.manga_id
-            {manga_where}
-            GROUP BY m.title
-            ORDER BY count DESC
-            LIMIT 1
-            """
-            df = pd.DataFrame(conn.execute(text(query), params).fetchall())
-            if not df.empty:
-                summary['most_chapters'] = {
-                    'title': df['title'].iloc[0],
-                    'count': int(df['count'].iloc[0])
-                }
-
+            # Scoped to this transaction, so the pooled connection goes back without the limit
+            conn.execute(sql_text(f"SET LOCAL statement_timeout = {SUMMARY_STATEMENT_TIMEOUT_MS}"))
+            rows = conn.execute(sql_text(query), params).all()
     except Exception as e:
         st.error(f"Error summarizing data: {str(e)}")
         return None
 
+    # Branches keep their own ORDER BY, so rows of each kind arrive already ranked
+    by_kind = {}
+    for row in rows:
+        by_kind.setdefault(row.kind, []).append(row)
+
+    filtered_count = int(by_kind['total'][0].value)
+
+    def ranked(kind):
+        return [
+            {'name': row.label, 'count': int(row.value),
+             'percent': (row.value / filtered_count * 100) if filtered_count else 0}
+            for row in by_kind.get(kind, [])
+        ]
+
+    summary = {
+        'total_manga': filtered_count,
+        'total_manga_all': int(by_kind['total_all'][0].value),
+        'total_chapters': int(by_kind['chapters'][0].value),
+        'genres': ranked('genre'),
+        'statuses': ranked('status'),
+        'original_languages': ranked('language'),
+        'year_range': {
+            'min': by_kind['year_min'][0].year,
+            'max': by_kind['year_max'][0].year
+        },
+        'top_years': [
+            {'year': row.year if row.year is not None else 'NULL', 'count': int(row.value)}
+            for row in by_kind.get('top_year', [])
+        ]
+    }
+    if 'recent_update' in by_kind:
+        recent = by_kind['recent_update'][0]
+        summary['recent_update'] = {'title': recent.label, 'date': recent.detail}
+    if 'most_chapters' in by_kind:
+        most = by_kind['most_chapters'][0]
+        summary['most_chapters'] = {'title': most.label, 'count': int(most.value)}
+
     return summary, manga_filters
 
 
@@ -278,7 +192,7 @@ def generate_insights(manga_filters=None, selected_manga=None):
         return False, ["No insights available due to data retrieval issues."]
 
     if summary['total_manga'] == 0:
-        if not st.session_state.selected_manga:
+        if not selected_manga:
             return False, ["No manga match the current filters."]
 
         if selected_manga:
@@ -329,8 +243,8 @@ def generate_insights(manga_filters=None, selected_manga=None):
                 content = json_str.group(1)
 
             try:
-                parsed_insights = json.loads(content)
-            except json.JSONDecodeError as e:
+                parsed_insights = orjson.loads(content)
+            except orjson.JSONDecodeError as e:
                 st.error(f"Failed to parse LLM response: {e}")
                 return False, ["Error generating insights for single manga."]
 
@@ -431,7 +345,7 @@ def generate_insights(manga_filters=None, selected_manga=None):
         try:
             match = re.search(r"```json\s*(.*?)\s*```", content, re.DOTALL)
             json_str = match.group(1) if match else content.strip()
-            parsed = json.loads(json_str)
+            parsed = orjson.loads(json_str)
             return parsed if isinstance(parsed, list) else []
         except Exception as e:
             st.error(f"Failed to parse insights: {e}")
@@ -1,7 +1,5 @@
 import streamlit as st
-import pandas as pd
-from sqlalchemy import text
-from src.dashboard.core.database.postgres import get_postgres_engine
+from src.dashboard.core.database.postgres import get_postgres_engine, sql_text
 
 
 def sanitize_input(search_term):
@@ -24,8 +22,8 @@ def search_manga(search_term, limit=25):
         with engine.connect() as conn:
             query = "SELECT title FROM manga WHERE title ILIKE :search_term LIMIT :limit"
             params = {'search_term': f'%{search_term}%', 'limit': limit}
-            results = conn.execute(text(query), params)
-            titles = pd.DataFrame(results.fetchall(), columns=results.keys())['title'].tolist()
+            # Read the single title column straight into a list, without building a DataFrame
+            titles = conn.scalars(sql_text(query), params).all()
         return titles
     except Exception as e:
         st.error(f"Error in manga search: {str(e)}")
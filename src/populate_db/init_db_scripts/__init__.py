@@ -1 +1,2 @@
 from .inserter_instance import MangaDataInserter, ChapterDataInserter, ImageDataInserter
+from .dashboard_schema import DashboardSchema
@@ -0,0 +1,277 @@
+import os
+from typing import List
+from src.populate_db import PostgresConfig
+from src.utils import setup_logger
+
+
+# Setup logging file
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+log_dir = os.path.join(os.path.dirname(project_root), "logs")
+log_file = os.path.join(log_dir, "insert_original_db.log")
+logger = setup_logger(log_file)
+
+
+# Canonical, trimmed copy of manga.genres maintained on write instead of trimmed on every read.
+# Generated columns cannot hold a subquery, so the trim runs inside an IMMUTABLE SQL function.
+DASHBOARD_COLUMNS: List[str] = [
+    """
+    CREATE OR REPLACE FUNCTION trim_text_array(arr TEXT[]) RETURNS TEXT[]
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE
+    AS $$ SELECT ARRAY(SELECT trim(x) FROM unnest(arr) x) $$
+    """,
+    "ALTER TABLE manga ADD COLUMN IF NOT EXISTS genres_clean TEXT[] "
+    "GENERATED ALWAYS AS (trim_text_array(genres::TEXT[])) STORED",
+]
+
+# Indexes backing the dashboard's filter predicates and its ORDER BY updated_at DESC LIMIT
+# sample query, so filtered samples can stop early on an index-ordered scan
+DASHBOARD_INDEXES: List[str] = [
+    "CREATE INDEX IF NOT EXISTS manga_updated_at_idx ON manga (updated_at DESC)",
+    "CREATE INDEX IF NOT EXISTS manga_status_updated_at_idx ON manga (status, updated_at DESC)",
+    "CREATE INDEX IF NOT EXISTS manga_original_language_updated_at_idx "
+    "ON manga (original_language, updated_at DESC)",
+    "CREATE INDEX IF NOT EXISTS manga_genres_clean_gin_idx ON manga USING GIN (genres_clean)",
+    # Exact-title lookups for the selected manga's cover, stats and sample
+    "CREATE INDEX IF NOT EXISTS manga_title_idx ON manga (title)",
+    # Equality/range filters on status, language and year, covering the cover carousel columns
+    "CREATE INDEX IF NOT EXISTS manga_status_lang_year_idx "
+    "ON manga (status, original_language, published_year) INCLUDE (title, cover_url)",
+    # Status plus year range without a language filter, which the index above can only filter on
+    "CREATE INDEX IF NOT EXISTS manga_status_year_idx ON manga (status, published_year)",
+    # Backs the manga -> chapter joins in quick stats and chapter counts as index-only scans
+    "CREATE INDEX IF NOT EXISTS chapter_manga_id_idx "
+    "ON chapter (manga_id) INCLUDE (chapter_id, pages, created_at)",
+]
+
+# Pre-aggregated tables the dashboard reads instead of recomputing them per request
+DASHBOARD_TABLES: List[str] = [
+    """
+    CREATE TABLE IF NOT EXISTS manga_genre_cooccurrence (
+        genre1 TEXT NOT NULL,
+        genre2 TEXT NOT NULL,
+        status TEXT,
+        original_language TEXT,
+        published_year INTEGER,
+        count BIGINT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS manga_genre_cooccurrence_filters_idx "
+    "ON manga_genre_cooccurrence (status, original_language, published_year)",
+    """
+    CREATE TABLE IF NOT EXISTS summary_metrics (
+        metric_name TEXT PRIMARY KEY,
+        metric_value NUMERIC,
+        last_updated TIMESTAMP
+    )
+    """,
+    # Lets the refresh upsert into a summary_metrics table created before it had a primary key
+    "CREATE UNIQUE INDEX IF NOT EXISTS summary_metrics_metric_name_idx ON summary_metrics (metric_name)",
+    # Written by the dashboard feedback form, matching the table pandas to_sql used to create
+    "CREATE TABLE IF NOT EXISTS user_feedback (feedback_text TEXT)",
+]
+
+# Tables whose statistics go stale after each bulk load
+DASHBOARD_ANALYZE_TABLES: List[str] = ["manga", "chapter"]
+
+REFRESH_GENRE_COOCCURRENCE = """
+INSERT INTO manga_genre_cooccurrence (genre1, genre2, status, original_language, published_year, count)
+WITH manga_genres AS (
+    SELECT m.status, m.original_language, m.published_year,
+           ARRAY(SELECT DISTINCT g FROM unnest(m.genres_clean) g ORDER BY 1) AS genres
+    FROM manga m
+)
+SELECT mg.genres[i], mg.genres[j], mg.status, mg.original_language, mg.published_year, COUNT(*)
+FROM manga_genres mg,
+    LATERAL generate_subscripts(mg.genres, 1) i,
+    LATERAL generate_subscripts(mg.genres, 1) j
+WHERE i < j
+GROUP BY 1, 2, 3, 4, 5
+"""
+
+REFRESH_SUMMARY_METRICS = """
+INSERT INTO summary_metrics (metric_name, metric_value, last_updated)
+SELECT v.metric_name, v.metric_value, NOW()
+FROM (
+    SELECT
+        (SELECT COUNT(*) FROM manga) AS total_manga,
+        COUNT(*) AS total_chapters,
+        COALESCE(SUM(pages), 0) AS total_images,
+        COALESCE(AVG(pages), 0) AS avg_pages_per_chapter
+    FROM chapter
+) s,
+LATERAL (VALUES
+    ('total_manga', s.total_manga::NUMERIC),
+    ('total_chapters', s.total_chapters::NUMERIC),
+    ('total_images', s.total_images::NUMERIC),
+    ('avg_pages_per_chapter', s.avg_pages_per_chapter::NUMERIC)
+) AS v(metric_name, metric_value)
+ON CONFLICT (metric_name) DO UPDATE
+SET metric_value = EXCLUDED.metric_value, last_updated = EXCLUDED.last_updated
+"""
+
+
+# Keep summary_metrics current as manga and chapter change, so the dashboard never recounts them.
+# Statement-level triggers with transition tables apply one delta per statement, not per row;
+# plpgsql only plans the branch that runs, so each function reads just the tables its event has.
+DASHBOARD_TRIGGERS: List[str] = [
+    """
+    CREATE OR REPLACE FUNCTION summary_metrics_manga_delta() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    DECLARE
+        d_count NUMERIC := 0;
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            SELECT COUNT(*) INTO d_count FROM new_rows;
+        ELSIF TG_OP = 'DELETE' THEN
+            SELECT -COUNT(*) INTO d_count FROM old_rows;
+        END IF;
+        IF d_count <> 0 THEN
+            UPDATE summary_metrics
+            SET metric_value = metric_value + d_count, last_updated = NOW()
+            WHERE metric_name = 'total_manga';
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION summary_metrics_chapter_delta() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    DECLARE
+        d_count NUMERIC := 0;
+        d_pages NUMERIC := 0;
+    BEGIN
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            SELECT d_count + COUNT(*), d_pages + COALESCE(SUM(pages), 0) INTO d_count, d_pages FROM new_rows;
+        END IF;
+        IF TG_OP IN ('DELETE', 'UPDATE') THEN
+            SELECT d_count - COUNT(*), d_pages - COALESCE(SUM(pages), 0) INTO d_count, d_pages FROM old_rows;
+        END IF;
+        IF d_count = 0 AND d_pages = 0 THEN
+            RETURN NULL;
+        END IF;
+        UPDATE summary_metrics s
+        SET metric_value = s.metric_value + d.delta, last_updated = NOW()
+        FROM (VALUES ('total_chapters', d_count), ('total_images', d_pages)) AS d(name, delta)
+        WHERE s.metric_name = d.name;
+        UPDATE summary_metrics
+        SET metric_value = COALESCE(
+                (SELECT metric_value FROM summary_metrics WHERE metric_name = 'total_images')
+                / NULLIF((SELECT metric_value FROM summary_metrics WHERE metric_name = 'total_chapters'), 0),
+                0),
+            last_updated = NOW()
+        WHERE metric_name = 'avg_pages_per_chapter';
+        RETURN NULL;
+    END
+    $$
+    """,
+    # A trigger with transition tables covers a single event, so each event gets its own
+    "DROP TRIGGER IF EXISTS summary_metrics_manga_insert ON manga",
+    "CREATE TRIGGER summary_metrics_manga_insert AFTER INSERT ON manga "
+    "REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION summary_metrics_manga_delta()",
+    "DROP TRIGGER IF EXISTS summary_metrics_manga_delete ON manga",
+    "CREATE TRIGGER summary_metrics_manga_delete AFTER DELETE ON manga "
+    "REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION summary_metrics_manga_delta()",
+    "DROP TRIGGER IF EXISTS summary_metrics_chapter_insert ON chapter",
+    "CREATE TRIGGER summary_metrics_chapter_insert AFTER INSERT ON chapter "
+    "REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION summary_metrics_chapter_delta()",
+    "DROP TRIGGER IF EXISTS summary_metrics_chapter_update ON chapter",
+    "CREATE TRIGGER summary_metrics_chapter_update AFTER UPDATE ON chapter "
+    "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION summary_metrics_chapter_delta()",
+    "DROP TRIGGER IF EXISTS summary_metrics_chapter_delete ON chapter",
+    "CREATE TRIGGER summary_metrics_chapter_delete AFTER DELETE ON chapter "
+    "REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION summary_metrics_chapter_delta()",
+]
+
+
+class DashboardSchema:
+    """
+    Manages the indexes and derived objects the Streamlit dashboard reads from
+    """
+
+    def __init__(self, db_config: PostgresConfig):
+        """
+        Initialize the schema manager with database configuration
+
+        :param db_config: PostgresConfig instance
+        """
+        self.db_config = db_config
+
+    def create_columns(self) -> None:
+        """
+        Add the derived manga columns; adding a stored generated column backfills existing rows
+        """
+        with self.db_config.get_connection() as conn:
+            with conn.cursor() as cursor:
+                for statement in DASHBOARD_COLUMNS:
+                    cursor.execute(statement)
+            conn.commit()
+        logger.info("✅ Ensured derived manga columns")
+
+    def create_indexes(self) -> None:
+        """
+        Create the dashboard indexes if they do not exist yet
+        """
+        with self.db_config.get_connection() as conn:
+            with conn.cursor() as cursor:
+                for statement in DASHBOARD_INDEXES:
+                    cursor.execute(statement)
+                    logger.info(f"✅ Ensured index: {statement}")
+            conn.commit()
+
+    def create_tables(self) -> None:
+        """
+        Create the pre-aggregated dashboard tables if they do not exist yet
+        """
+        with self.db_config.get_connection() as conn:
+            with conn.cursor() as cursor:
+                for statement in DASHBOARD_TABLES:
+                    cursor.execute(statement)
+            conn.commit()
+        logger.info("✅ Ensured dashboard aggregate tables")
+
+    def create_triggers(self) -> None:
+        """
+        Install the triggers that keep summary_metrics up to date between full refreshes
+        """
+        with self.db_config.get_connection() as conn:
+            with conn.cursor() as cursor:
+                for statement in DASHBOARD_TRIGGERS:
+                    cursor.execute(statement)
+            conn.commit()
+        logger.info("✅ Ensured summary metrics triggers")
+
+    def refresh_genre_cooccurrence(self) -> None:
+        """
+        Rebuild the genre co-occurrence pairs grouped by status, language and year
+        """
+        with self.db_config.get_connection() as conn:
+            with conn.cursor() as cursor:
+                # DELETE rather than TRUNCATE so readers keep seeing the old rows until commit
+                cursor.execute("DELETE FROM manga_genre_cooccurrence")
+                cursor.execute(REFRESH_GENRE_COOCCURRENCE)
+                logger.info(f"✅ Refreshed genre co-occurrence with {cursor.rowcount} rows")
+            conn.commit()
+
+    def analyze_tables(self) -> None:
+        """
+        Refresh planner statistics after a bulk load so the dashboard indexes get picked
+        """
+        with self.db_config.get_connection() as conn:
+            with conn.cursor() as cursor:
+                for table in DASHBOARD_ANALYZE_TABLES:
+                    cursor.execute(f"ANALYZE {table}")
+            conn.commit()
+        logger.info("✅ Analyzed dashboard tables")
+
+    def refresh_summary_metrics(self) -> None:
+        """
+        Recompute the global quick stats from scratch; the triggers keep them current afterwards,
+        and this also corrects any drift, e.g. after a TRUNCATE, which the triggers do not track
+        """
+        with self.db_config.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(REFRESH_SUMMARY_METRICS)
+            conn.commit()
+        logger.info("✅ Refreshed summary metrics")
@@ -1,4 +1,4 @@
-from src.populate_db.init_db_scripts import MangaDataInserter, ChapterDataInserter, ImageDataInserter
+from src.populate_db.init_db_scripts import MangaDataInserter, ChapterDataInserter, ImageDataInserter, DashboardSchema
 from src.populate_db import pg_config, mongo_config
 from src.utils import setup_logger
 import os
@@ -25,6 +25,18 @@ def main():
         manga_inserter.insert_manga_from_csv(f"{data_dir}\\manga_data.csv")
     except Exception as e:
         logger.error(f"❌ Error in inserting manga process: {e}")
+
+    try:
+        dashboard_schema = DashboardSchema(pg_config)
+        dashboard_schema.create_columns()
+        dashboard_schema.create_indexes()
+        dashboard_schema.analyze_tables()
+        dashboard_schema.create_tables()
+        dashboard_schema.create_triggers()
+        dashboard_schema.refresh_genre_cooccurrence()
+        dashboard_schema.refresh_summary_metrics()
+    except Exception as e:
+        logger.error(f"❌ Error in preparing dashboard schema: {e}")
     #
     # try:
     #     chapter_inserter.insert_chapters_from_csv(f"{data_dir}\\chapter_data.csv")
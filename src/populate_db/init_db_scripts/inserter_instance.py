@@ -1,7 +1,10 @@
 import psycopg2.extras
 import csv
 import os
-import json
+try:
+    from orjson import loads as json_loads, JSONDecodeError
+except ImportError:
+    from json import loads as json_loads, JSONDecodeError
 from typing import Dict, Any, List, Tuple
 import pymongo
 from tqdm import tqdm
@@ -215,6 +218,14 @@ class ImageDataInserter:
         self.collection = mongo_config.get_collection()
         logger.info("Initialized ImageDataInserter with collection: %s", self.collection.full_name)
 
+    def ensure_indexes(self) -> None:
+        """
+        Create the lookup indexes used by the chapter_id upserts and the dashboard, once per load
+        """
+        self.collection.create_index([("manga_id", 1)])
+        self.collection.create_index([("chapter_id", 1)])
+        logger.info("Ensured indexes on collection: %s", self.collection.full_name)
+
     @staticmethod
     def _validate_image_data(raw_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         documents = []
@@ -240,10 +251,11 @@ class ImageDataInserter:
             raise FileNotFoundError(f"JSON file not found: {json_file}")
 
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                raw_data = json.load(f)
+            # Read as bytes: both parsers take UTF-8 bytes directly, skipping a decode to str
+            with open(json_file, 'rb') as f:
+                raw_data = json_loads(f.read())
             logger.info("Loaded JSON data from %s", json_file)
-        except json.JSONDecodeError as e:
+        except JSONDecodeError as e:
             logger.error("Error decoding JSON file %s: %s", json_file, e)
             return
         except Exception as e:
@@ -256,6 +268,7 @@ class ImageDataInserter:
             logger.warning("No valid data to insert from file: %s", json_file)
             return
 
+        self.ensure_indexes()
         logger.info("Starting insertion of %d chapters", len(documents))
 
         try: